@@ -3,7 +3,7 @@
 This script analyzes how often models agree/disagree and how that relates to
 trade outcomes. It writes:
 - analytics/output/agreement_analysis.json
-- analytics/output/agreement_chart.png
+- analytics/output/agreement_chart.png (skip with --no-chart)
 """
 
 from __future__ import annotations
@@ -20,11 +20,15 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
+from matplotlib.patches import Patch
 import pandas as pd
 
-from db_loader import load_eval_outcomes, load_model_outcomes
+from db_loader import _widen_scores, load_complete_agreement
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+MODEL_IDS: tuple[str, ...] = ("claude", "gpt4o", "gemini")
+WIN_RATE_COLOR = "#10b981"
+AVG_R_COLOR = "#8b5cf6"
 CATEGORY_ORDER = [
     "unanimous_trade",
     "majority_trade",
@@ -33,49 +37,88 @@ CATEGORY_ORDER = [
 ]
 
 
-def _classify_agreement(trade_votes: int) -> str:
-    if trade_votes == 3:
-        return "unanimous_trade"
-    if trade_votes == 2:
-        return "majority_trade"
-    if trade_votes == 1:
-        return "majority_skip"
-    return "unanimous_skip"
+# Indexed by trade-vote count (0..3), so classification is a single fancy-index.
+_CATEGORY_BY_VOTES = np.array(CATEGORY_ORDER[::-1])
+
+
+def _classify_agreement(trade_votes: np.ndarray) -> np.ndarray:
+    return _CATEGORY_BY_VOTES[np.clip(trade_votes, 0, len(MODEL_IDS))]
+
+
+def _dissenter_stats(votes: np.ndarray, wins: np.ndarray) -> np.ndarray:
+    """Rows of the result: times dissenting, dissenter correct, majority correct (per model)."""
+    # All models at once: column j of `dissent` marks rows where model j voted skip.
+    dissent = votes == 0
+    skip_right = dissent & (wins == 0)[:, None]
+    return np.stack([dissent.sum(axis=0), skip_right.sum(axis=0), (dissent & ~skip_right).sum(axis=0)])
 
 
 def _safe_corr(left: pd.Series, right: pd.Series) -> float | None:
-    aligned = pd.concat([left, right], axis=1).dropna()
-    if aligned.empty:
+    a = left.to_numpy(dtype=float)
+    b = right.to_numpy(dtype=float)
+    complete = ~(np.isnan(a) | np.isnan(b))
+    a = a[complete]
+    b = b[complete]
+    if a.size == 0 or np.ptp(a) == 0 or np.ptp(b) == 0:
         return None
-    if aligned.iloc[:, 0].nunique() < 2 or aligned.iloc[:, 1].nunique() < 2:
+    corr = float(np.corrcoef(a, b)[0, 1])
+    if np.isnan(corr):
         return None
-    corr = aligned.iloc[:, 0].corr(aligned.iloc[:, 1])
-    if pd.isna(corr):
-        return None
-    return float(corr)
+    return corr
 
 
 def _pct(value: float) -> float:
     return float(value * 100.0)
 
 
-def run(days: int) -> None:
+def _save_chart(summary: pd.DataFrame) -> Path:
+    """Render win rate / avg R per agreement category to agreement_chart.png."""
+    chart_df = summary.reset_index()
+    x = np.arange(len(chart_df))
+    width = 0.38
+
+    # Both series go through one bar call; legend handles are built
+    # explicitly since the call carries no per-series label.
+    n = len(chart_df)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(
+        np.concatenate([x - width / 2, x + width / 2]),
+        np.concatenate([chart_df["win_rate"].to_numpy() * 100, chart_df["avg_r"].to_numpy()]),
+        width,
+        color=[WIN_RATE_COLOR] * n + [AVG_R_COLOR] * n,
+    )
+    ax.set_title("Agreement Category vs Outcomes")
+    ax.set_xticks(x)
+    ax.set_xticklabels(chart_df["agreement_category"], rotation=20, ha="right")
+    ax.set_ylabel("Win Rate (%) / Avg R")
+    ax.legend(
+        handles=[
+            Patch(color=WIN_RATE_COLOR, label="Win Rate (%)"),
+            Patch(color=AVG_R_COLOR, label="Avg R"),
+        ]
+    )
+    ax.grid(axis="y", alpha=0.25)
+    fig.tight_layout()
+
+    chart_path = OUTPUT_DIR / "agreement_chart.png"
+    fig.savefig(chart_path, dpi=150)
+    plt.close(fig)
+    return chart_path
+
+
+def run(days: int, chart: bool = True) -> None:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    model_df = load_model_outcomes(days=days)
-    eval_df = load_eval_outcomes(days=days, trades_only=True)
+    # Completeness (all 3 models responded) is filtered in SQL.
+    # Scores back to float64 so averages serialize as stored, not with float32 noise
+    model_complete = _widen_scores(load_complete_agreement(days=days, n_models=len(MODEL_IDS)))
+    incomplete_evals = int(model_complete.attrs.get("incomplete_evaluations", 0))
 
-    if model_df.empty or eval_df.empty:
+    if model_complete.empty:
         print(f"No outcomes found for the last {days} days.")
         return
 
-    # Keep only evaluations where all 3 model outputs are present.
-    model_counts = model_df.groupby("evaluation_id")["model_id"].nunique()
-    complete_eval_ids = model_counts[model_counts == 3].index
-    incomplete_evals = int((model_counts != 3).sum())
-
-    model_complete = model_df[model_df["evaluation_id"].isin(complete_eval_ids)].copy()
-    eval_complete = eval_df[eval_df["evaluation_id"].isin(complete_eval_ids)].copy()
+    eval_complete = model_complete.drop_duplicates("evaluation_id").set_index("evaluation_id")
 
     if len(eval_complete) < 10:
         print(
@@ -84,40 +127,26 @@ def run(days: int) -> None:
         )
         return
 
-    pivot = (
-        model_complete.pivot_table(
-            index="evaluation_id",
-            columns="model_id",
-            values="should_trade",
-            aggfunc="first",
-        )
-        .reindex(columns=["claude", "gpt4o", "gemini"])
-        .dropna()
-    )
-
-    scores = (
-        model_complete.pivot_table(
-            index="evaluation_id",
-            columns="model_id",
-            values="trade_score",
-            aggfunc="first",
-        )
-        .reindex(columns=["claude", "gpt4o", "gemini"])
-        .dropna()
+    # One reshape for both value columns instead of two pivot_table passes.
+    wide = (
+        model_complete.drop_duplicates(["evaluation_id", "model_id"])
+        .set_index(["evaluation_id", "model_id"])[["should_trade", "trade_score"]]
+        .unstack("model_id")
     )
+    pivot = wide["should_trade"].reindex(columns=list(MODEL_IDS)).dropna()
+    scores = wide["trade_score"].reindex(columns=list(MODEL_IDS)).dropna()
 
     agreement_df = pd.DataFrame(index=pivot.index)
     agreement_df["trade_votes"] = pivot.sum(axis=1).astype(int)
-    agreement_df["agreement_category"] = agreement_df["trade_votes"].apply(_classify_agreement)
+    agreement_df["agreement_category"] = _classify_agreement(agreement_df["trade_votes"].to_numpy())
 
-    outcome_cols = ["evaluation_id", "r_multiple", "ensemble_trade_score"]
-    agreement_df = agreement_df.reset_index().merge(
-        eval_complete[outcome_cols], on="evaluation_id", how="inner"
+    # Everything below stays indexed by evaluation_id, so joins align on the index
+    # rather than hash-merging on a column.
+    agreement_df = agreement_df.join(
+        eval_complete[["r_multiple", "ensemble_trade_score"]], how="inner"
     )
-
-    spread_df = scores.max(axis=1) - scores.min(axis=1)
-    spread_df = spread_df.rename("score_spread").reset_index()
-    agreement_df = agreement_df.merge(spread_df, on="evaluation_id", how="inner")
+    score_spread = (scores.max(axis=1) - scores.min(axis=1)).rename("score_spread")
+    agreement_df = agreement_df.join(score_spread, how="inner")
     agreement_df["win"] = (agreement_df["r_multiple"] > 0).astype(int)
     agreement_df["abs_r_multiple"] = agreement_df["r_multiple"].abs()
 
@@ -127,7 +156,7 @@ def run(days: int) -> None:
             win_rate=("win", "mean"),
             avg_r=("r_multiple", "mean"),
             avg_ensemble_score=("ensemble_trade_score", "mean"),
-            count=("evaluation_id", "count"),
+            count=("win", "size"),
         )
         .reindex(CATEGORY_ORDER)
         .fillna(0)
@@ -147,46 +176,21 @@ def run(days: int) -> None:
     print(f"spread vs abs(r_multiple): {spread_absr_corr}")
     print(f"spread vs win/loss: {spread_win_corr}")
 
-    split_23 = agreement_df[agreement_df["trade_votes"] == 2][["evaluation_id", "win"]].merge(
-        pivot.reset_index(), on="evaluation_id", how="inner"
-    )
-
-    dissenter_rows: list[dict[str, float | int | str]] = []
-    for model in ["claude", "gpt4o", "gemini"]:
-        if split_23.empty:
-            dissenter_rows.append(
-                {
-                    "model": model,
-                    "times_dissenting": 0,
-                    "dissenter_correct_pct": 0.0,
-                    "majority_correct_pct": 0.0,
-                }
-            )
-            continue
-
-        is_dissenter = split_23[model] == 0
-        subset = split_23[is_dissenter].copy()
-
-        if subset.empty:
-            dissenter_rows.append(
-                {
-                    "model": model,
-                    "times_dissenting": 0,
-                    "dissenter_correct_pct": 0.0,
-                    "majority_correct_pct": 0.0,
-                }
-            )
-            continue
+    split_23 = pivot.join(agreement_df.loc[agreement_df["trade_votes"] == 2, ["win"]], how="inner")
 
-        subset["dissenter_correct"] = (subset[model] == subset["win"]).astype(int)
-        subset["majority_correct"] = (1 == subset["win"]).astype(int)
+    votes = split_23[list(MODEL_IDS)].to_numpy(dtype=np.int8)
+    wins = split_23["win"].to_numpy(dtype=np.int8)
+    times_dissenting, dissenter_correct, majority_correct = _dissenter_stats(votes, wins)
 
+    dissenter_rows: list[dict[str, float | int | str]] = []
+    for j, model in enumerate(MODEL_IDS):
+        times = int(times_dissenting[j])
         dissenter_rows.append(
             {
                 "model": model,
-                "times_dissenting": int(len(subset)),
-                "dissenter_correct_pct": _pct(float(subset["dissenter_correct"].mean())),
-                "majority_correct_pct": _pct(float(subset["majority_correct"].mean())),
+                "times_dissenting": times,
+                "dissenter_correct_pct": _pct(dissenter_correct[j] / times) if times else 0.0,
+                "majority_correct_pct": _pct(majority_correct[j] / times) if times else 0.0,
             }
         )
 
@@ -195,36 +199,7 @@ def run(days: int) -> None:
     print("\nContrarian Accuracy (2/3 splits)")
     print(dissenter_df.to_string(index=False))
 
-    chart_df = summary.reset_index()
-    x = np.arange(len(chart_df))
-    width = 0.38
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(
-        x - width / 2,
-        chart_df["win_rate"] * 100,
-        width,
-        label="Win Rate (%)",
-        color="#10b981",
-    )
-    ax.bar(
-        x + width / 2,
-        chart_df["avg_r"],
-        width,
-        label="Avg R",
-        color="#8b5cf6",
-    )
-    ax.set_title("Agreement Category vs Outcomes")
-    ax.set_xticks(x)
-    ax.set_xticklabels(chart_df["agreement_category"], rotation=20, ha="right")
-    ax.set_ylabel("Win Rate (%) / Avg R")
-    ax.legend()
-    ax.grid(axis="y", alpha=0.25)
-    fig.tight_layout()
-
-    chart_path = OUTPUT_DIR / "agreement_chart.png"
-    fig.savefig(chart_path, dpi=150)
-    plt.close(fig)
+    chart_path = _save_chart(summary) if chart else None
 
     result = {
         "days": days,
@@ -233,12 +208,19 @@ def run(days: int) -> None:
         "agreement_vs_outcome": [
             {
                 "category": str(idx),
-                "win_rate": float(row["win_rate"]),
-                "avg_r": float(row["avg_r"]),
-                "avg_ensemble_score": float(row["avg_ensemble_score"]),
-                "count": int(row["count"]),
+                "win_rate": float(win_rate),
+                "avg_r": float(avg_r),
+                "avg_ensemble_score": float(avg_score),
+                "count": int(count),
             }
-            for idx, row in summary.iterrows()
+            # Zipped column arrays: iterrows would build a Series per row
+            for idx, win_rate, avg_r, avg_score, count in zip(
+                summary.index,
+                summary["win_rate"].to_numpy(),
+                summary["avg_r"].to_numpy(),
+                summary["avg_ensemble_score"].to_numpy(),
+                summary["count"].to_numpy(),
+            )
         ],
         "spread_correlations": {
             "spread_vs_abs_r_multiple": spread_absr_corr,
@@ -252,14 +234,16 @@ def run(days: int) -> None:
         json.dump(result, f, indent=2)
 
     print(f"\nSaved JSON: {json_path}")
-    print(f"Saved chart: {chart_path}")
+    if chart_path is not None:
+        print(f"Saved chart: {chart_path}")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Model agreement analysis")
     parser.add_argument("--days", type=int, default=90, help="Lookback window in days")
+    parser.add_argument("--no-chart", action="store_true", help="Skip rendering agreement_chart.png")
     args = parser.parse_args()
-    run(days=args.days)
+    run(days=args.days, chart=not args.no_chart)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 """Agreement analysis by model direction and outcome.
 
-Loads model scores from SQLite, classifies direction per model, computes
-agreement buckets, and reports win rate by agreement type.
+Loads model scores from SQLite with per-model direction and agreement type
+classified in the query, and reports win rate by agreement type.
 """
 
 from __future__ import annotations
@@ -11,74 +11,83 @@ from pathlib import Path
 
 import pandas as pd
 
-from db_loader import _connect
+from db_loader import _cutoff, _read_sql
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "output"
 OUTPUT_PATH = OUTPUT_DIR / "agreement_analysis.csv"
+BULLISH_ABOVE = 60
+BEARISH_BELOW = 40
+OUTCOME_WIN_VALUES = {
+    "WIN": 1.0,
+    "LOSS": 0.0,
+    "SCRATCH": 0.5,
+}
+
+
+def _direction_sql(score_col: str) -> str:
+    """SQL CASE mapping a score column to its directional label."""
+    return (
+        f"CASE WHEN {score_col} > {BULLISH_ABOVE} THEN 'bullish' "
+        f"WHEN {score_col} < {BEARISH_BELOW} THEN 'bearish' "
+        "ELSE 'neutral' END"
+    )
 
 
-def classify_direction(score: float) -> str:
-    """Map score to directional label."""
-    if score > 60:
-        return "bullish"
-    if score < 40:
-        return "bearish"
-    return "neutral"
-
-
-def classify_agreement(row: pd.Series) -> str:
-    """Classify agreement type across three model directions."""
-    directions = [row["claude_direction"], row["gpt_direction"], row["gemini_direction"]]
-    unique = len(set(directions))
-    if unique == 1:
-        return "unanimous"
-    if unique == 2:
-        return "majority"
-    return "split"
-
-
-def outcome_to_win_value(outcome: str) -> float:
-    """Convert outcome string to numeric win value."""
-    mapping = {
-        "WIN": 1.0,
-        "LOSS": 0.0,
-        "SCRATCH": 0.5,
-    }
-    normalized = str(outcome).upper()
-    return mapping.get(normalized, float("nan"))
+def outcome_to_win_value(outcome: pd.Series) -> pd.Series:
+    """Convert outcome strings to numeric win values (NaN when unrecognized)."""
+    return outcome.astype(str).str.upper().map(OUTCOME_WIN_VALUES)
 
 
 def load_agreement_source(days: int) -> pd.DataFrame:
-    """Load per-evaluation model scores + outcome from SQLite."""
-    conn = _connect()
-    df = pd.read_sql_query(
-        """
+    """Load per-evaluation model scores, directions, agreement type + outcome from SQLite."""
+    df = _read_sql(
+        f"""
+        WITH scores AS (
+            SELECT
+                e.id AS evaluation_id,
+                e.timestamp,
+                e.symbol,
+                MAX(CASE WHEN m.model_id = 'claude' THEN m.trade_score END) AS claude_score,
+                MAX(CASE WHEN m.model_id = 'gpt4o' THEN m.trade_score END) AS gpt_score,
+                MAX(CASE WHEN m.model_id = 'gemini' THEN m.trade_score END) AS gemini_score,
+                CASE
+                    WHEN o.r_multiple > 0 THEN 'WIN'
+                    WHEN o.r_multiple < 0 THEN 'LOSS'
+                    ELSE 'SCRATCH'
+                END AS outcome
+            FROM evaluations e
+            JOIN model_outputs m ON m.evaluation_id = e.id
+            JOIN outcomes o ON o.evaluation_id = e.id
+            WHERE e.timestamp >= ?
+              AND o.trade_taken = 1
+              AND o.r_multiple IS NOT NULL
+            GROUP BY e.id, e.timestamp, e.symbol, o.r_multiple
+        ),
+        directions AS (
+            SELECT
+                *,
+                {_direction_sql("claude_score")} AS claude_direction,
+                {_direction_sql("gpt_score")} AS gpt_direction,
+                {_direction_sql("gemini_score")} AS gemini_direction
+            FROM scores
+        )
         SELECT
-            e.id AS evaluation_id,
-            e.timestamp,
-            e.symbol,
-            MAX(CASE WHEN m.model_id = 'claude' THEN m.trade_score END) AS claude_score,
-            MAX(CASE WHEN m.model_id = 'gpt4o' THEN m.trade_score END) AS gpt_score,
-            MAX(CASE WHEN m.model_id = 'gemini' THEN m.trade_score END) AS gemini_score,
+            *,
             CASE
-                WHEN o.r_multiple > 0 THEN 'WIN'
-                WHEN o.r_multiple < 0 THEN 'LOSS'
-                ELSE 'SCRATCH'
-            END AS outcome
-        FROM evaluations e
-        JOIN model_outputs m ON m.evaluation_id = e.id
-        JOIN outcomes o ON o.evaluation_id = e.id
-        WHERE e.timestamp >= datetime('now', ? || ' days')
-          AND o.trade_taken = 1
-          AND o.r_multiple IS NOT NULL
-        GROUP BY e.id, e.timestamp, e.symbol, o.r_multiple
-        ORDER BY e.timestamp DESC
+                WHEN claude_direction = gpt_direction AND gpt_direction = gemini_direction
+                    THEN 'unanimous'
+                WHEN claude_direction = gpt_direction
+                    OR gpt_direction = gemini_direction
+                    OR claude_direction = gemini_direction
+                    THEN 'majority'
+                ELSE 'split'
+            END AS agreement_type
+        FROM directions
+        ORDER BY timestamp DESC
         """,
-        conn,
-        params=[f"-{days}"],
+        params=[_cutoff(days)],
         parse_dates=["timestamp"],
     )
-    conn.close()
     return df
 
 
@@ -97,11 +106,7 @@ def run(days: int) -> None:
         print("No complete rows found after skipping NULL model scores.")
         return
 
-    df["claude_direction"] = df["claude_score"].map(classify_direction)
-    df["gpt_direction"] = df["gpt_score"].map(classify_direction)
-    df["gemini_direction"] = df["gemini_score"].map(classify_direction)
-    df["agreement_type"] = df.apply(classify_agreement, axis=1)
-    df["win_value"] = df["outcome"].map(outcome_to_win_value)
+    df["win_value"] = outcome_to_win_value(df["outcome"])
 
     df = df[df["win_value"].notna()].copy()
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import os
 import sys
@@ -10,85 +11,98 @@ from pathlib import Path
 # Ensure analytics/ is on sys.path for bare imports when run from project root
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
 import pandas as pd
 
-from db_loader import load_eval_outcomes, load_model_outcomes
+from db_loader import _widen_scores, load_eval_outcomes, load_model_calibration
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "output"
 MODEL_IDS: tuple[str, ...] = ("claude", "gpt4o", "gemini")
+BUCKET_LABELS: list[str] = [f"[{start}-{start + 10})" for start in range(0, 90, 10)] + ["[90-100]"]
 
 
-def outcome_from_r_multiple(r_multiple: pd.Series) -> pd.Series:
-    """Convert R-multiple to binary win outcome (1=win, 0=loss/breakeven)."""
-    return (r_multiple > 0).astype(int)
+def outcome_from_r_multiple(r_multiple: pd.Series) -> np.ndarray:
+    """Convert R-multiple to a boolean win array (True=win, False=loss/breakeven)."""
+    return r_multiple.to_numpy() > 0
 
 
-def brier_score(confidence: pd.Series, outcome: pd.Series) -> float:
+def brier_score(confidence: pd.Series, outcome: np.ndarray | pd.Series) -> float:
     """Compute Brier score using confidence in [0, 100] and binary outcomes."""
-    probs = confidence.astype(float) / 100.0
-    return float(np.mean((probs - outcome.astype(float)) ** 2))
+    probs = confidence.to_numpy(dtype=float) / 100.0
+    return float(np.mean((probs - outcome) ** 2))
 
 
 def calibration_buckets(
     confidence: pd.Series,
-    outcome: pd.Series,
+    outcome: np.ndarray | pd.Series,
 ) -> pd.DataFrame:
     """Build 10 confidence buckets with actual win-rate and count."""
-    conf = confidence.astype(float).clip(lower=0, upper=100)
-    bucket_index = np.floor(conf / 10).astype(int).clip(0, 9)
-
-    bucket_df = pd.DataFrame({"bucket": bucket_index, "outcome": outcome.astype(int)})
-    grouped = (
-        bucket_df.groupby("bucket", as_index=False)
-        .agg(count=("outcome", "size"), win_rate=("outcome", "mean"))
-        .set_index("bucket")
+    conf = confidence.to_numpy(dtype=float)
+    # NULL confidences are skipped, as the per-model SQL path does
+    valid = ~np.isnan(conf)
+    conf = np.clip(conf[valid], 0, 100)
+    bucket_index = np.clip((conf // 10).astype(np.intp), 0, 9)
+    won = np.asarray(outcome, dtype=float)[valid]
+    counts = np.bincount(bucket_index, minlength=10)
+    wins = np.bincount(bucket_index, weights=won, minlength=10)
+    return _bucket_frame(counts, wins)
+
+
+def _bucket_frame(counts: np.ndarray, wins: np.ndarray) -> pd.DataFrame:
+    """Shape per-bucket counts and wins into the 10-row calibration table."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = wins / counts
+
+    return pd.DataFrame(
+        {
+            "bucket": np.arange(10),
+            "label": BUCKET_LABELS,
+            "predicted_confidence": np.arange(10) * 10.0 + 5.0,
+            "count": counts,
+            "actual_win_rate": np.where(counts > 0, win_rate, None),
+        }
     )
 
-    rows: list[dict[str, float | int | str | None]] = []
-    for bucket in range(10):
-        start = bucket * 10
-        end = (bucket + 1) * 10
-        label = f"[{start}-{end})" if bucket < 9 else "[90-100]"
-        if bucket in grouped.index:
-            count = int(grouped.loc[bucket, "count"])
-            win_rate = float(grouped.loc[bucket, "win_rate"])
-        else:
-            count = 0
-            win_rate = np.nan
-        rows.append(
-            {
-                "bucket": bucket,
-                "label": label,
-                "predicted_confidence": float(start + 5),
-                "count": count,
-                "actual_win_rate": None if np.isnan(win_rate) else win_rate,
-            }
-        )
 
-    return pd.DataFrame(rows)
+def _pyplot():
+    """Import pyplot on first use (Agg backend) so --no-plot runs skip matplotlib entirely."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
+    return plt
 
-def plot_calibration_curve(buckets: pd.DataFrame, title: str, output_path: Path) -> None:
-    """Plot calibration curve with count bars on a secondary axis."""
+
+def _draw_curve(ax, buckets: pd.DataFrame, *, labelled: bool, diagonal_width: float):
+    """Draw count bars, the perfect-calibration diagonal and the win-rate line; return the twin axis."""
     x = buckets["predicted_confidence"].to_numpy(dtype=float)
     win_rates = pd.to_numeric(buckets["actual_win_rate"], errors="coerce").to_numpy(dtype=float)
     counts = buckets["count"].to_numpy(dtype=float)
+    valid = ~np.isnan(win_rates)
 
-    fig, ax1 = plt.subplots(figsize=(10, 6))
-    ax2 = ax1.twinx()
+    ax2 = ax.twinx()
+    ax2.bar(x, counts, width=8.5, alpha=0.2, color="tab:blue", label="Observation count" if labelled else None)
+
+    ax.plot([0, 100], [0, 1], "k--", linewidth=diagonal_width, label="Perfect calibration" if labelled else None)
+    ax.plot(
+        x[valid],
+        win_rates[valid],
+        marker="o",
+        linewidth=2,
+        color="tab:orange",
+        label="Actual win rate" if labelled else None,
+    )
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 1)
+    return ax2
 
-    ax2.bar(x, counts, width=8.5, alpha=0.2, color="tab:blue", label="Observation count")
 
-    valid = ~np.isnan(win_rates)
-    ax1.plot([0, 100], [0, 1], "k--", linewidth=1.2, label="Perfect calibration")
-    ax1.plot(x[valid], win_rates[valid], marker="o", linewidth=2, color="tab:orange", label="Actual win rate")
+def plot_calibration_curve(buckets: pd.DataFrame, title: str, output_path: Path) -> None:
+    """Plot calibration curve with count bars on a secondary axis."""
+    plt = _pyplot()
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+    ax2 = _draw_curve(ax1, buckets, labelled=True, diagonal_width=1.2)
 
-    ax1.set_xlim(0, 100)
-    ax1.set_ylim(0, 1)
     ax1.set_xlabel("Predicted confidence (%)")
     ax1.set_ylabel("Actual win rate")
     ax2.set_ylabel("Observation count")
@@ -108,32 +122,21 @@ def plot_model_calibration(
     output_path: Path,
 ) -> None:
     """Render per-model calibration curves in 3 stacked subplots."""
+    plt = _pyplot()
     fig, axes = plt.subplots(3, 1, figsize=(10, 14), sharex=True)
 
     for ax, model_id in zip(axes, MODEL_IDS):
+        ax.set_title(model_id)
         buckets = model_bucket_map.get(model_id)
         if buckets is None or buckets.empty:
             ax.text(0.5, 0.5, "No compliant predictions", ha="center", va="center")
-            ax.set_title(model_id)
             ax.set_ylim(0, 1)
             ax.set_xlim(0, 100)
             continue
 
-        x = buckets["predicted_confidence"].to_numpy(dtype=float)
-        win_rates = pd.to_numeric(buckets["actual_win_rate"], errors="coerce").to_numpy(dtype=float)
-        counts = buckets["count"].to_numpy(dtype=float)
-        valid = ~np.isnan(win_rates)
-
-        ax2 = ax.twinx()
-        ax2.bar(x, counts, width=8.5, alpha=0.2, color="tab:blue")
-
-        ax.plot([0, 100], [0, 1], "k--", linewidth=1)
-        ax.plot(x[valid], win_rates[valid], marker="o", linewidth=2, color="tab:orange")
-        ax.set_title(model_id)
+        ax2 = _draw_curve(ax, buckets, labelled=False, diagonal_width=1)
         ax.set_ylabel("Win rate")
         ax2.set_ylabel("Count")
-        ax.set_ylim(0, 1)
-        ax.set_xlim(0, 100)
 
     axes[-1].set_xlabel("Predicted confidence (%)")
     fig.suptitle("Calibration Curves by Model", y=0.995)
@@ -143,9 +146,14 @@ def plot_model_calibration(
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Confidence calibration analysis")
+    parser.add_argument("--no-plot", action="store_true", help="Only write calibration.json; skip chart rendering")
+    args = parser.parse_args()
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    eval_outcomes = load_eval_outcomes(days=90)
+    # Confidences back to float64 so Brier scores use the stored values, not float32 noise
+    eval_outcomes = _widen_scores(load_eval_outcomes(days=90))
     eval_outcomes = eval_outcomes[eval_outcomes["r_multiple"].notna()].copy()
 
     scored_trades = len(eval_outcomes)
@@ -156,10 +164,8 @@ def main() -> None:
         print("No scored trades found. Exiting without generating calibration outputs.")
         return
 
-    model_outcomes = load_model_outcomes(days=90)
-    model_outcomes = model_outcomes[
-        (model_outcomes["r_multiple"].notna()) & (model_outcomes["compliant"].astype(bool))
-    ].copy()
+    # Per-model Brier scores and buckets are aggregated in SQL (<= 30 rows).
+    model_calibration = load_model_calibration(days=90)
 
     ensemble_outcome = outcome_from_r_multiple(eval_outcomes["r_multiple"])
     ensemble_brier = brier_score(eval_outcomes["ensemble_confidence"], ensemble_outcome)
@@ -172,16 +178,21 @@ def main() -> None:
     }
     model_bucket_map: dict[str, pd.DataFrame] = {}
 
+    model_groups = dict(tuple(model_calibration.groupby("model_id", sort=False)))
     for model_id in MODEL_IDS:
-        model_df = model_outcomes[model_outcomes["model_id"] == model_id].copy()
-        if model_df.empty:
+        rows = model_groups.get(model_id)
+        if rows is None or rows.empty:
             print(f"WARNING: No compliant predictions for {model_id}; skipping model-level metrics.")
             continue
 
-        model_target = outcome_from_r_multiple(model_df["r_multiple"])
-        model_brier = brier_score(model_df["confidence"], model_target)
-        brier_scores[model_id] = model_brier
-        model_bucket_map[model_id] = calibration_buckets(model_df["confidence"], model_target)
+        bucket_index = rows["bucket"].to_numpy(dtype=np.intp)
+        counts = np.zeros(10, dtype=np.int64)
+        wins = np.zeros(10, dtype=float)
+        counts[bucket_index] = rows["n"].to_numpy()
+        wins[bucket_index] = rows["wins"].to_numpy(dtype=float)
+
+        brier_scores[model_id] = float(rows["sq_error"].sum() / rows["n"].sum())
+        model_bucket_map[model_id] = _bucket_frame(counts, wins)
 
     ensemble_buckets = calibration_buckets(eval_outcomes["ensemble_confidence"], ensemble_outcome)
 
@@ -201,6 +212,10 @@ def main() -> None:
     with open(calibration_json_path, "w", encoding="utf-8") as f:
         json.dump(output_json, f, indent=2)
 
+    print(f"Saved: {calibration_json_path}")
+    if args.no_plot:
+        return
+
     plot_calibration_curve(
         ensemble_buckets,
         title="Ensemble Confidence Calibration",
@@ -212,7 +227,6 @@ def main() -> None:
         output_path=OUTPUT_DIR / "calibration_by_model.png",
     )
 
-    print(f"Saved: {calibration_json_path}")
     print(f"Saved: {OUTPUT_DIR / 'calibration_curve.png'}")
     print(f"Saved: {OUTPUT_DIR / 'calibration_by_model.png'}")
 
@@ -8,14 +8,46 @@ Usage:
     from db_loader import load_eval_outcomes, load_model_outputs, load_weights, DB_PATH
 """
 
+import atexit
+import hashlib
 import json
+import os
+import queue
 import sqlite3
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Optional, Type
+from typing import Callable, Iterator, Optional, Sequence, Type
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 
+try:  # optional: C-speed JSON
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional: vectorized joins over the SQLite file
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:  # optional: Arrow-native SQLite reads
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+except ImportError:
+    adbc_sqlite = None
+
+try:  # optional: Parquet engine behind the on-disk frame cache
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 try:
     from .schema import Evaluation, ModelOutput, Outcome, WeightHistory
 except ImportError:
@@ -31,6 +63,15 @@ DATA_DIR = PROJECT_ROOT / "data"
 DB_PATH = DATA_DIR / "market-data-bridge.db"
 LEGACY_DB_PATH = DATA_DIR / "bridge.db"
 WEIGHTS_PATH = DATA_DIR / "weights.json"
+CACHE_DIR = ANALYTICS_DIR / ".cache"
+CACHE_MAX_AGE_S = 3600
+# sqlite3 reads are fetched in chunks of this many rows, so peak memory holds
+# one chunk's Python objects rather than the whole result's.
+READ_CHUNK_ROWS = 50_000
+# Column checks against the Pydantic schema; MDB_VALIDATE=0 skips them.
+VALIDATE_SCHEMAS = os.environ.get("MDB_VALIDATE", "1") != "0"
+# Opt in to DuckDB for the join-heavy loaders (needs the duckdb package).
+USE_DUCKDB = os.environ.get("MDB_DUCKDB") == "1"
 
 
 def _resolve_db_path() -> Path:
@@ -42,7 +83,18 @@ def _resolve_db_path() -> Path:
     return DB_PATH
 
 
-def _connect() -> sqlite3.Connection:
+# Read-side tuning applied to every connection from _connect(): memory-map up
+# to 1 GiB of the DB file, give the page cache 128 MiB, keep temp b-trees
+# (GROUP BY / ORDER BY spills) in memory and refuse writes.
+READ_PRAGMAS: tuple[str, ...] = (
+    "PRAGMA mmap_size = 1073741824",
+    "PRAGMA cache_size = -131072",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = 1",
+)
+
+
+def _connect(check_same_thread: bool = True) -> sqlite3.Connection:
     """Open a read-only connection to the analytics SQLite DB."""
     db_path = _resolve_db_path()
     if not db_path.exists():
@@ -50,13 +102,303 @@ def _connect() -> sqlite3.Connection:
             f"Database not found at {db_path}. "
             "Start the server at least once to create it."
         )
-    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+class _ConnPool:
+    """
+    Bounded pool of long-lived read-only connections.
+
+    Connections are opened lazily through _connect() and handed to one
+    borrower at a time, so SQLite's page cache stays warm across loader calls
+    (and across threads in Streamlit/Jupyter). Idle connections are dropped
+    if DB_PATH is repointed.
+    """
+
+    def __init__(self, size: int = 4):
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._db_path: Path | None = None
+
+    def _open(self) -> sqlite3.Connection:
+        return _connect(check_same_thread=False)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        db_path = _resolve_db_path()
+        with self._lock:
+            if db_path != self._db_path:
+                self.close()
+                self._db_path = db_path
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_POOL = _ConnPool()
+atexit.register(_POOL.close)
+
+
+def _connect_adbc():
+    """Open a read-only ADBC connection to the analytics DB, with the same READ_PRAGMAS."""
+    # Autocommit: each read sees a fresh snapshot, as with the sqlite3 pool.
+    conn = adbc_sqlite.connect(f"file:{_resolve_db_path()}?mode=ro", autocommit=True)
+    with conn.cursor() as cur:
+        for pragma in READ_PRAGMAS:
+            cur.execute(pragma)
+    return conn
+
+
+class _AdbcConnPool(_ConnPool):
+    """_ConnPool of ADBC connections for the Arrow-native read path."""
+
+    def _open(self):
+        return _connect_adbc()
+
+
+_ADBC_POOL = _AdbcConnPool()
+atexit.register(_ADBC_POOL.close)
+
+
+def get_conn():
+    """Borrow a pooled read-only connection: ``with get_conn() as conn: ...``. Do not close it."""
+    return _POOL.connection()
+
+
+@lru_cache(maxsize=1)
+def _duckdb_conn(db_path: Path):
+    """In-process DuckDB with the SQLite DB attached read-only as ``mdb``."""
+    con = duckdb.connect()
+    con.execute(f"ATTACH '{db_path}' AS mdb (TYPE sqlite, READ_ONLY)")
+    # SQLite's julianday() for _epoch_ms; DuckDB's julian() counts from midnight.
+    con.execute("CREATE MACRO julianday(x) AS julian(TRY_CAST(x AS TIMESTAMP)) - 0.5")
+    return con
+
+
+def _arrow_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Align a frame from an Arrow-native reader with pd.read_sql_query's output."""
+    # Arrow readers type all-NULL columns as numeric; sqlite3 yields object/None.
+    for col in df.columns[df.isna().all()]:
+        df[col] = pd.Series([None] * len(df), index=df.index, dtype=object)
+    return df
+
+
+def _parse_dates(df: pd.DataFrame, parse_dates: list[str] | None) -> pd.DataFrame:
+    """
+    Convert date columns in place to datetime64[ns, UTC]: epoch milliseconds
+    (see _epoch_ms) directly, anything else by parsing the text.
+    """
+    for col in parse_dates or ():
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], unit="ms", utc=True)
+        else:
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    return df
+
+
+def _read_sql(
+    sql: str,
+    params: Sequence | None = None,
+    parse_dates: list[str] | None = None,
+    join_heavy: bool = False,
+) -> pd.DataFrame:
+    """
+    Run a read query and return a DataFrame.
+
+    With adbc-driver-sqlite installed, results stream straight into Arrow
+    buffers instead of being boxed row by row through sqlite3; otherwise this
+    is pd.read_sql_query on a pooled connection. ``join_heavy`` queries run on
+    DuckDB's multithreaded engine over the attached SQLite file when
+    MDB_DUCKDB=1 and duckdb is installed (rows tied on ORDER BY may come back
+    in a different order). Either way the frame carries plain NumPy dtypes,
+    so callers see the same result.
+    """
+    return _parse_dates(_fetch_frame(sql, params, join_heavy), parse_dates)
+
+
+def _fetch_frame(sql: str, params: Sequence | None, join_heavy: bool) -> pd.DataFrame:
+    db_path = _resolve_db_path()
+    params = list(params) if params else None
+
+    if join_heavy and USE_DUCKDB and duckdb is not None and db_path.exists():
+        try:
+            cur = _duckdb_conn(db_path).cursor()  # per-call cursor: thread-safe
+            cur.execute("SET search_path = 'mdb,memory'")  # tables, then the julianday macro
+            df = cur.execute(sql, params).fetch_df()
+        except duckdb.Error as exc:
+            # e.g. the sqlite extension cannot be installed offline
+            print(f"Warning: DuckDB read failed ({exc}); falling back to SQLite.")
+        else:
+            return _arrow_frame(df)
+
+    if adbc_sqlite is None or not db_path.exists():
+        with get_conn() as conn:
+            chunks = pd.read_sql_query(sql, conn, params=params, chunksize=READ_CHUNK_ROWS)
+            return _concat_chunks([_downcast_scores(chunk) for chunk in chunks])
+
+    with _ADBC_POOL.connection() as conn, conn.cursor() as cur:
+        cur.execute(sql, params)
+        table = cur.fetch_arrow_table()
+    # Release Arrow buffers column by column as pandas takes them over.
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    return _arrow_frame(df)
+
+
+def _concat_chunks(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    """Join sqlite3 result chunks into the frame a single read would have produced."""
+    if len(chunks) == 1:
+        return chunks[0]
+    with warnings.catch_warnings():
+        # Chunks where a column is entirely NULL come back as object; infer_objects
+        # restores the dtype a single read would have inferred.
+        warnings.simplefilter("ignore", FutureWarning)
+        df = pd.concat(chunks, ignore_index=True, copy=False)
+    return df.infer_objects()
+
+
+# ── Parquet cache ────────────────────────────────────────────────────────────
+
+def _db_mtime(db_path: Path | None = None) -> float:
+    """Latest modification time of the DB file (default: the analytics DB) and its WAL sidecar."""
+    db_path = db_path or _resolve_db_path()
+    wal_path = db_path.with_name(db_path.name + "-wal")
+    return max((p.stat().st_mtime for p in (db_path, wal_path) if p.exists()), default=0.0)
+
+
+# Failures reading or writing a cache file (no engine, read-only or full disk, corrupt
+# or truncated file); the cache is skipped and the data loaded from SQLite instead.
+_CACHE_ERRORS: tuple[type[Exception], ...] = (ImportError, OSError, ValueError) + (
+    (pyarrow.ArrowException,) if pyarrow is not None else ()
+)
+
+
+def _parquet_cached(
+    name: str, key: tuple, load: Callable[[], pd.DataFrame], db_path: Path | None = None
+) -> pd.DataFrame:
+    """
+    Return load(), memoized as analytics/.cache/<name>_<hash>.parquet.
+
+    A cached file is reused while it is newer than the DB it was read from
+    (db_path, default the analytics DB; WAL included) and younger than
+    CACHE_MAX_AGE_S, so scripts run back-to-back share one SQLite read. Writing
+    a file prunes the stale ones for the same name, so the cache stays bounded.
+    The cache is best-effort: any error reading or writing it falls back to
+    load(), so scripts still only need read access to the DB.
+    """
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+    path = CACHE_DIR / f"{name}_{digest}.parquet"
+    db_mtime = _db_mtime(db_path)
+
+    def fresh(cached_at: float) -> bool:
+        return cached_at > db_mtime and time.time() - cached_at < CACHE_MAX_AGE_S
+
+    try:
+        cached_at = path.stat().st_mtime
+    except OSError:
+        cached_at = None
+    if cached_at is not None and fresh(cached_at):
+        try:
+            return pd.read_parquet(path)
+        except _CACHE_ERRORS:
+            pass
+
+    df = load()
+    # Write to a per-process temp file and rename it into place, so a concurrent
+    # reader sees either the previous file or the complete new one.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp_path, compression="zstd", index=False)
+        os.replace(tmp_path, path)
+    except _CACHE_ERRORS:
+        with suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+        return df
+
+    # Other keys' files that could no longer be served are dead weight.
+    for other in CACHE_DIR.glob(f"{name}_{'?' * len(digest)}.parquet"):
+        with suppress(OSError):
+            if other != path and not fresh(other.stat().st_mtime):
+                other.unlink()
+    return df
+
+
+# ── In-process cache ─────────────────────────────────────────────────────────
+
+def _freeze(value):
+    """Make list arguments (e.g. columns=[...]) usable in a cache key."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _mtime_lru_cache(maxsize: int = 32):
+    """
+    Memoize a loader per (args, kwargs, DB path, DB mtime).
+
+    Any server write bumps the DB/WAL mtime and so misses the cache. Hits return
+    a copy so callers can mutate the result freely; ``use_cache=False`` bypasses
+    the cache entirely.
+    """
+
+    def decorator(fn):
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if kwargs.get("use_cache") is False:
+                return fn(*args, **kwargs)
+            key = (
+                tuple(_freeze(a) for a in args),
+                tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())),
+                _resolve_db_path(),
+                _db_mtime(),
+            )
+            with lock:
+                result = cache.get(key)
+                if result is not None:
+                    cache.move_to_end(key)
+            if result is None:
+                result = fn(*args, **kwargs)
+                with lock:
+                    cache[key] = result
+                    if len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return result.copy()
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
 # ── Validation ───────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=16)
+def _model_fields(model: Type[BaseModel]) -> frozenset[str]:
+    """Field names of a Pydantic model, computed once per model."""
+    return frozenset(model.model_fields)
+
+
 def validate_schema(df: pd.DataFrame, model: Type[BaseModel], exclude: list[str] = None, strict: bool = True):
     """
     Validate that DataFrame columns match the Pydantic model fields.
@@ -67,27 +409,152 @@ def validate_schema(df: pd.DataFrame, model: Type[BaseModel], exclude: list[str]
         exclude: List of columns to ignore (expected to be missing)
         strict: If True, warns if non-excluded model fields are missing in DataFrame.
     """
-    if df.empty:
+    # Non-strict checks never warn, so skip them outright.
+    if not VALIDATE_SCHEMAS or not strict or df.empty:
         return
 
-    if exclude is None:
-        exclude = []
-
-    df_cols = set(df.columns)
-    model_fields = set(model.model_fields.keys())
-
     # Expected fields are model fields minus excluded ones
-    expected_fields = model_fields - set(exclude)
+    expected_fields = _model_fields(model) - frozenset(exclude or ())
 
     # Check for missing columns
-    missing = expected_fields - df_cols
-    if strict and missing:
-        print(f"Warning: DataFrame is missing columns required by {model.__name__}: {missing}")
+    missing = expected_fields.difference(df.columns)
+    if missing:
+        print(f"Warning: DataFrame is missing columns required by {model.__name__}: {set(missing)}")
 
     # We could also check for extra columns, but joined queries usually have extra columns
     # from other tables, so we skip that check by default.
 
 
+# Bounded 0-100 score/confidence columns (plus small ratios); float32 halves
+# their memory and bandwidth without losing meaningful precision. r_multiple
+# stays float64 since it is summed and averaged downstream.
+SCORE_COLUMNS: tuple[str, ...] = (
+    "trade_score",
+    "confidence",
+    "ensemble_trade_score",
+    "ensemble_confidence",
+    "rvol",
+)
+
+# Low-cardinality labels: stored once per distinct value instead of per row.
+CATEGORY_COLUMNS: tuple[str, ...] = (
+    "symbol",
+    "direction",
+    "model_id",
+    "time_of_day",
+    "volatility_regime",
+    "liquidity_bucket",
+    "decision_type",
+    "setup_type",
+    "exit_reason",
+)
+
+# 0/1 flags; narrowed to int8 only when the column has no NULLs, so missing
+# values keep their NaN semantics.
+FLAG_COLUMNS: tuple[str, ...] = (
+    "prefilter_passed",
+    "should_trade",
+    "compliant",
+    "ensemble_should_trade",
+    "ensemble_unanimous",
+    "ensemble_majority_trade",
+    "guardrail_allowed",
+    "trade_taken",
+    "rule_followed",
+)
+
+
+def _downcast_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast any SCORE_COLUMNS present in df to float32 in place."""
+    for col in SCORE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    return df
+
+
+def _widen_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast float32 SCORE_COLUMNS in df back to float64 in place, before they feed reports.
+
+    Each value goes through its shortest float32 repr, so a stored 0.65 / 72.3 comes
+    back as exactly that double rather than 0.6499999761581421 / 72.30000305175781.
+    """
+    for col in SCORE_COLUMNS:
+        if col in df.columns and df[col].dtype == np.float32:
+            df[col] = df[col].to_numpy().astype(str).astype(np.float64)
+    return df
+
+
+def _narrow_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink known columns in place: scores to float32, labels to category, flags to int8."""
+    _downcast_scores(df)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    for col in FLAG_COLUMNS:
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype("int8")
+    return df
+
+
+def _cutoff(days: int) -> str:
+    """
+    UTC cutoff for a ``days`` look-back, formatted like SQLite's datetime('now').
+
+    Binding the literal keeps the timestamp comparison a plain range predicate
+    that idx_eval_timestamp can seek on.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    return cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _epoch_ms(expr: str, alias: str) -> str:
+    """
+    SELECT expression returning a TEXT timestamp as integer epoch milliseconds.
+
+    SQLite parses the text once in C and _read_sql converts the integers
+    straight to datetime64, instead of pandas parsing strings row by row.
+    """
+    return f"CAST(ROUND((julianday({expr}) - 2440587.5) * 86400000) AS BIGINT) AS {alias}"
+
+
+@lru_cache(maxsize=32)
+def _eval_filter_sql(has_days: bool, has_symbol: bool, prefilter: bool, trades_only: bool, alias: str) -> str:
+    """WHERE body for one filter shape; identical text per shape keeps sqlite3's statement cache warm."""
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    if prefilter:
+        conditions.append(f"{prefix}prefilter_passed = 1")
+    if trades_only:
+        conditions.append("o.trade_taken = 1")
+    if has_days:
+        conditions.append(f"{prefix}timestamp >= ?")
+    if has_symbol:
+        conditions.append(f"{prefix}symbol = ?")
+    return " AND ".join(conditions) or "1 = 1"
+
+
+def _build_eval_filter(
+    days: int | None,
+    symbol: str | None,
+    prefilter: bool = True,
+    trades_only: bool = False,
+    alias: str = "e",
+) -> tuple[str, list]:
+    """
+    Shared evaluation filter: (WHERE body, params).
+
+    ``days=None`` drops the look-back; ``trades_only`` filters the outcomes
+    table, which must be joined as ``o``. Values are only ever bound as params.
+    """
+    params: list = []
+    if days is not None:
+        params.append(_cutoff(days))
+    if symbol:
+        params.append(symbol)
+    return _eval_filter_sql(days is not None, bool(symbol), prefilter, trades_only, alias), params
+
+
 def _build_select_cols(model: Type[BaseModel], exclude: list[str] = None) -> str:
     """Helper to build SELECT clause from Pydantic model fields."""
     if exclude is None:
@@ -96,18 +563,64 @@ def _build_select_cols(model: Type[BaseModel], exclude: list[str] = None) -> str
     return ", ".join(cols)
 
 
+def _select_list(allowed: dict[str, str], columns: Sequence[str] | None) -> str:
+    """
+    Build a SELECT list from a whitelist of column name -> SQL expression.
+
+    ``columns=None`` selects every whitelisted column; otherwise only the
+    requested ones, in order. Unknown names raise ValueError, so caller input
+    never reaches the SQL text.
+    """
+    if columns is None:
+        return ", ".join(allowed.values())
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}; choose from {list(allowed)}")
+    return ", ".join(allowed[c] for c in columns)
+
+
+def _date_columns(candidates: Sequence[str], columns: Sequence[str] | None) -> list[str]:
+    """Subset of candidates that will be present in the result."""
+    return [c for c in candidates if columns is None or c in columns]
+
+
+# ── JSON ─────────────────────────────────────────────────────────────────────
+
+def _json_loads(raw: str | bytes):
+    """json.loads via orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumpb(obj, indent: bool = False) -> bytes:
+    """json.dumps as UTF-8 bytes via orjson when installed (NumPy scalars included); stdlib otherwise."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass  # e.g. float subclasses or >64-bit ints; let stdlib handle them
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def _json_dumps(obj, indent: bool = False) -> str:
+    """_json_dumpb decoded to str. Callers writing files should prefer _json_dumpb + write_bytes."""
+    return _json_dumpb(obj, indent).decode("utf-8")
+
+
 # ── Weights ──────────────────────────────────────────────────────────────────
 
 def load_weights() -> dict:
     """Load current ensemble weights from data/weights.json."""
-    with open(WEIGHTS_PATH) as f:
-        return json.load(f)
+    with open(WEIGHTS_PATH, "rb") as f:
+        return _json_loads(f.read())
 
 
 def save_weights(weights: dict) -> None:
     """Write updated weights to data/weights.json (for recalibration script)."""
-    with open(WEIGHTS_PATH, "w") as f:
-        json.dump(weights, f, indent=2)
+    with open(WEIGHTS_PATH, "wb") as f:
+        f.write(_json_dumpb(weights, indent=True))
 
 
 def insert_weight_history(weights: dict, reason: str | None = None) -> None:
@@ -118,228 +631,431 @@ def insert_weight_history(weights: dict, reason: str | None = None) -> None:
         weights: Dictionary with claude, gpt4o, gemini, k, sample_size, source, etc.
         reason: Description of why weights changed (e.g., "recalibration")
     """
+    insert_weight_history_bulk([(weights, reason)])
+
+
+def insert_weight_history_bulk(rows: list[tuple[dict, str | None]]) -> None:
+    """
+    Insert several weight history records in one transaction.
+
+    Args:
+        rows: (weights, reason) pairs, as for insert_weight_history
+    """
+    if not rows:
+        return
     conn = sqlite3.connect(DB_PATH)
     try:
-        sample_size = weights.get("sample_size")
-        conn.execute(
-            """
-            INSERT INTO weight_history (weights_json, sample_size, reason, created_at)
-            VALUES (?, ?, ?, datetime('now'))
-            """,
-            (json.dumps(weights), sample_size, reason)
-        )
-        conn.commit()
+        # The server keeps the DB in WAL mode, where NORMAL is durable enough
+        # and avoids an fsync per commit.
+        conn.execute("PRAGMA synchronous = NORMAL")
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO weight_history (weights_json, sample_size, reason, created_at)
+                VALUES (?, ?, ?, datetime('now'))
+                """,
+                [(_json_dumps(weights), weights.get("sample_size"), reason) for weights, reason in rows],
+            )
     finally:
         conn.close()
 
 
 # ── Evaluations ──────────────────────────────────────────────────────────────
 
-def load_evaluations(days: int = 90, symbol: str | None = None) -> pd.DataFrame:
+EVALUATION_BLOBS = ["features_json", "weights_json", "guardrail_flags_json"]
+EVALUATION_COLUMNS: dict[str, str] = {
+    c: c for c in Evaluation.model_fields if c not in EVALUATION_BLOBS
+} | {"timestamp": _epoch_ms("evaluations.timestamp", "timestamp")}
+
+
+@_mtime_lru_cache()
+def load_evaluations(
+    days: int = 90,
+    symbol: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
     """
     Load evaluations that passed pre-filter.
 
-    Returns DataFrame with columns matching Evaluation model (excluding features_json).
+    Returns DataFrame with columns matching Evaluation model (excluding features_json),
+    or only ``columns`` (keys of EVALUATION_COLUMNS) when given.
     """
-    conn = _connect()
-    conditions = ["prefilter_passed = 1"]
-    params: list = []
+    where, params = _build_eval_filter(days, symbol, alias="")
 
-    conditions.append("timestamp >= datetime('now', ? || ' days')")
-    params.append(f"-{days}")
+    # SELECT list comes from the schema, excluding large blobs
+    select_cols = _select_list(EVALUATION_COLUMNS, columns)
 
-    if symbol:
-        conditions.append("symbol = ?")
-        params.append(symbol)
-
-    # Dynamically build SELECT list from schema, excluding large blobs
-    select_cols = _build_select_cols(Evaluation, exclude=["features_json", "weights_json", "guardrail_flags_json"])
-
-    where = " AND ".join(conditions)
-    df = pd.read_sql_query(
+    df = _read_sql(
         f"""
         SELECT {select_cols}
         FROM evaluations
         WHERE {where}
-        ORDER BY timestamp DESC
+        ORDER BY evaluations.timestamp DESC
         """,
-        conn,
         params=params,
-        parse_dates=["timestamp"],
+        parse_dates=_date_columns(["timestamp"], columns),
     )
-    conn.close()
 
-    validate_schema(df, Evaluation, exclude=["features_json", "weights_json", "guardrail_flags_json"])
-    return df
+    validate_schema(df, Evaluation, exclude=EVALUATION_BLOBS, strict=columns is None)
+    return _narrow_dtypes(df)
 
 
 # ── Model Outputs ────────────────────────────────────────────────────────────
 
-def load_model_outputs(days: int = 90, symbol: str | None = None) -> pd.DataFrame:
-    """
-    Load per-model outputs joined with evaluation metadata.
-    """
-    conn = _connect()
-    conditions = ["e.prefilter_passed = 1"]
-    params: list = []
+_MODEL_OUTPUT_EVAL_FIELDS: tuple[str, ...] = (
+    "symbol", "direction", "timestamp",
+    "time_of_day", "volatility_regime", "liquidity_bucket",
+    "ensemble_trade_score", "ensemble_should_trade",
+)
+MODEL_OUTPUT_COLUMNS: dict[str, str] = {
+    c: f"m.{c}"
+    for c in (
+        "evaluation_id", "model_id",
+        "trade_score", "confidence", "expected_rr",
+        "should_trade", "compliant", "latency_ms", "model_version",
+        "extension_risk", "exhaustion_risk",
+        "float_rotation_risk", "market_alignment_score",
+    )
+} | {
+    c: f"e.{c}" for c in _MODEL_OUTPUT_EVAL_FIELDS
+} | {"timestamp": _epoch_ms("e.timestamp", "timestamp")}
 
-    conditions.append("e.timestamp >= datetime('now', ? || ' days')")
-    params.append(f"-{days}")
 
-    if symbol:
-        conditions.append("e.symbol = ?")
-        params.append(symbol)
+@_mtime_lru_cache()
+def load_model_outputs(
+    days: int = 90,
+    symbol: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Load per-model outputs joined with evaluation metadata.
 
-    where = " AND ".join(conditions)
+    Pass ``columns`` (keys of MODEL_OUTPUT_COLUMNS) to select only those.
+    """
+    where, params = _build_eval_filter(days, symbol, alias="")
 
-    # We still use manual selection for joins to handle aliasing and specific needs
-    df = pd.read_sql_query(
+    # Qualified column expressions handle aliasing across the join; evaluations
+    # are filtered in a subquery so only the window's rows are joined.
+    select_cols = _select_list(MODEL_OUTPUT_COLUMNS, columns)
+    eval_cols = ", ".join(("id",) + _MODEL_OUTPUT_EVAL_FIELDS)
+    df = _read_sql(
         f"""
-        SELECT
-            m.evaluation_id, m.model_id,
-            m.trade_score, m.confidence, m.expected_rr,
-            m.should_trade, m.compliant, m.latency_ms, m.model_version,
-            m.extension_risk, m.exhaustion_risk,
-            m.float_rotation_risk, m.market_alignment_score,
-            e.symbol, e.direction, e.timestamp,
-            e.time_of_day, e.volatility_regime, e.liquidity_bucket,
-            e.ensemble_trade_score, e.ensemble_should_trade
+        SELECT {select_cols}
         FROM model_outputs m
-        JOIN evaluations e ON m.evaluation_id = e.id
-        WHERE {where}
+        JOIN (SELECT {eval_cols} FROM evaluations WHERE {where}) e ON m.evaluation_id = e.id
         ORDER BY e.timestamp DESC
         """,
-        conn,
         params=params,
-        parse_dates=["timestamp"],
+        parse_dates=_date_columns(["timestamp"], columns),
     )
-    conn.close()
 
     # Validate against models (partial)
     # We exclude fields not selected in the query to avoid warnings
     validate_schema(df, ModelOutput, exclude=[
         "id", "reasoning", "raw_response", "error",
         "prompt_hash", "token_count", "api_response_id", "timestamp"
-    ])
+    ], strict=columns is None)
     # For Evaluation, we only select a few fields, so strict validation would be too noisy
     validate_schema(df, Evaluation, strict=False)
 
-    return df
+    return _narrow_dtypes(df)
 
 
 # ── Eval Outcomes (the key analytics join) ───────────────────────────────────
 
+# Note: we manually alias e.id as evaluation_id to match Outcome model FK
+# but Outcome model also has 'id' (primary key of outcome table).
+EVAL_OUTCOME_COLUMNS: dict[str, str] = {"evaluation_id": "e.id AS evaluation_id"} | {
+    c: f"e.{c}"
+    for c in (
+        "symbol", "direction", "timestamp",
+        "ensemble_trade_score", "ensemble_confidence",
+        "ensemble_expected_rr", "ensemble_should_trade",
+        "time_of_day", "volatility_regime", "liquidity_bucket",
+        "rvol", "minutes_since_open",
+    )
+} | {
+    c: f"o.{c}"
+    for c in (
+        "trade_taken", "decision_type",
+        "confidence_rating", "rule_followed", "setup_type",
+        "r_multiple", "exit_reason", "recorded_at",
+    )
+} | {
+    "timestamp": _epoch_ms("e.timestamp", "timestamp"),
+    "recorded_at": _epoch_ms("o.recorded_at", "recorded_at"),
+}
+
+
+@_mtime_lru_cache()
 def load_eval_outcomes(
     days: int = 90,
     symbol: str | None = None,
     trades_only: bool = True,
+    use_cache: bool = True,
+    columns: list[str] | None = None,
 ) -> pd.DataFrame:
     """
     Load evaluations joined with outcomes — the core analytics table.
+
+    Pass ``columns`` (keys of EVAL_OUTCOME_COLUMNS) to select only those.
+    Cached calls slice a materialized copy of the join (see _eval_outcomes_mv)
+    instead of running the join per argument set.
     """
-    conn = _connect()
-    conditions: list[str] = []
-    params: list = []
+    if not use_cache:
+        return _query_eval_outcomes(days, symbol, trades_only, columns)
 
+    df = _eval_outcomes_mv(_widen_mv_days(days))
+    keep = np.ones(len(df), dtype=bool)
     if trades_only:
-        conditions.append("o.trade_taken = 1")
-
+        keep &= df["trade_taken"].to_numpy() == 1
     if symbol:
-        conditions.append("e.symbol = ?")
-        params.append(symbol)
-
+        keep &= (df["symbol"] == symbol).to_numpy()
     if days:
-        conditions.append("e.timestamp >= datetime('now', ? || ' days')")
-        params.append(f"-{days}")
+        keep &= (df["timestamp"] >= pd.Timestamp(_cutoff(days), tz="UTC")).to_numpy()
+    if columns is not None:
+        _select_list(EVAL_OUTCOME_COLUMNS, columns)  # same validation as the SQL path
+        df = df[list(columns)]
+    return df.loc[keep].reset_index(drop=True)
+
+
+# Widest look-back (0 = all history) materialized so far in this process; it only grows,
+# so every earlier load_eval_outcomes() window stays a slice of the current copy.
+_mv_days: int | None = None
+_mv_days_lock = threading.Lock()
+
+
+def _widen_mv_days(days: int) -> int:
+    global _mv_days
+    with _mv_days_lock:
+        if _mv_days is None or not days or (_mv_days and days > _mv_days):
+            _mv_days = days or 0
+        return _mv_days
+
 
-    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+@_mtime_lru_cache(maxsize=1)
+def _eval_outcomes_mv(days: int) -> pd.DataFrame:
+    """
+    Every evaluation/outcome row from the last ``days`` (0 = all), materialized as
+    Parquet under analytics/.cache/.
+
+    Refreshed when the DB or its WAL changes (or after CACHE_MAX_AGE_S), so all
+    load_eval_outcomes() argument combinations within the window share one join
+    per DB snapshot. This stands in for a SQLite materialized table: analytics
+    connections are read-only and the server owns the schema, so the copy lives
+    on the Python side. Cutoffs only move forward, so a cached window is always
+    a superset of what a later call with the same ``days`` selects.
+    """
+    return _parquet_cached(
+        "eval_outcomes_mv",
+        (days,),
+        lambda: _query_eval_outcomes(days=days, symbol=None, trades_only=False),
+    )
 
-    # Note: we manually alias e.id as evaluation_id to match Outcome model FK
-    # but Outcome model also has 'id' (primary key of outcome table).
 
-    df = pd.read_sql_query(
+def _query_eval_outcomes(
+    days: int,
+    symbol: str | None,
+    trades_only: bool,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    where, params = _build_eval_filter(days or None, symbol, prefilter=False, trades_only=trades_only)
+    select_cols = _select_list(EVAL_OUTCOME_COLUMNS, columns)
+
+    df = _read_sql(
         f"""
-        SELECT
-            e.id as evaluation_id,
-            e.symbol, e.direction, e.timestamp,
-            e.ensemble_trade_score, e.ensemble_confidence,
-            e.ensemble_expected_rr, e.ensemble_should_trade,
-            e.time_of_day, e.volatility_regime, e.liquidity_bucket,
-            e.rvol, e.minutes_since_open,
-            o.trade_taken, o.decision_type,
-            o.confidence_rating, o.rule_followed, o.setup_type,
-            o.r_multiple, o.exit_reason, o.recorded_at
+        SELECT {select_cols}
         FROM evaluations e
         JOIN outcomes o ON o.evaluation_id = e.id
-        {where}
+        WHERE {where}
         ORDER BY e.timestamp DESC
         """,
-        conn,
         params=params,
-        parse_dates=["timestamp", "recorded_at"],
+        parse_dates=_date_columns(["timestamp", "recorded_at"], columns),
+        join_heavy=True,
     )
-    conn.close()
 
     validate_schema(df, Evaluation, strict=False)
-    validate_schema(df, Outcome, exclude=["id", "actual_entry_price", "actual_exit_price", "notes"])
+    validate_schema(
+        df,
+        Outcome,
+        exclude=["id", "actual_entry_price", "actual_exit_price", "notes"],
+        strict=columns is None,
+    )
 
-    return df
+    return _narrow_dtypes(df)
 
 
 # ── Model Outputs with Outcomes (for weight recalibration) ───────────────────
 
-def load_model_outcomes(days: int = 90) -> pd.DataFrame:
+MODEL_OUTCOME_COLUMNS: dict[str, str] = {
+    c: f"m.{c}"
+    for c in (
+        "evaluation_id", "model_id",
+        "trade_score", "confidence", "expected_rr",
+        "should_trade", "compliant",
+    )
+} | {
+    c: f"e.{c}" for c in ("symbol", "timestamp", "time_of_day", "volatility_regime")
+} | {
+    c: f"o.{c}" for c in ("trade_taken", "r_multiple")
+} | {"timestamp": _epoch_ms("e.timestamp", "timestamp")}
+
+
+@_mtime_lru_cache()
+def load_model_outcomes(
+    days: int = 90,
+    use_cache: bool = True,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
     """
     Load per-model predictions alongside trade outcomes.
+
+    Pass ``columns`` (keys of MODEL_OUTCOME_COLUMNS) to select only those.
     """
-    conn = _connect()
-    df = pd.read_sql_query(
+    if not use_cache:
+        return _query_model_outcomes(days, columns)
+    return _parquet_cached(
+        "model_outcomes",
+        (days, tuple(columns) if columns is not None else None),
+        lambda: _query_model_outcomes(days, columns),
+    )
+
+
+def _query_model_outcomes(days: int, columns: list[str] | None = None) -> pd.DataFrame:
+    select_cols = _select_list(MODEL_OUTCOME_COLUMNS, columns)
+    df = _read_sql(
+        f"""
+        SELECT {select_cols}
+        FROM model_outputs m
+        JOIN (
+            SELECT id, symbol, timestamp, time_of_day, volatility_regime
+            FROM evaluations
+            WHERE prefilter_passed = 1 AND timestamp >= ?
+        ) e ON m.evaluation_id = e.id
+        JOIN (
+            SELECT evaluation_id, trade_taken, r_multiple
+            FROM outcomes
+            WHERE trade_taken = 1 AND r_multiple IS NOT NULL
+        ) o ON o.evaluation_id = e.id
+        ORDER BY e.timestamp DESC
+        """,
+        params=[_cutoff(days)],
+        parse_dates=_date_columns(["timestamp"], columns),
+        join_heavy=True,
+    )
+
+    validate_schema(df, ModelOutput, strict=False)
+    validate_schema(df, Outcome, strict=False)
+
+    return _narrow_dtypes(df)
+
+
+# ── Per-model Calibration Aggregates ─────────────────────────────────────────
+
+def load_model_calibration(days: int = 90) -> pd.DataFrame:
+    """
+    Aggregate compliant per-model predictions into 10 confidence buckets in SQL.
+
+    Returns at most one row per (model_id, bucket) with the prediction count,
+    wins (r_multiple > 0) and the summed squared error of confidence/100 against
+    the win flag, so Brier scores are sq_error.sum() / n.sum() per model.
+    """
+    df = _read_sql(
         """
         SELECT
-            m.evaluation_id, m.model_id,
-            m.trade_score, m.confidence, m.expected_rr,
-            m.should_trade, m.compliant,
-            e.symbol, e.timestamp, e.time_of_day, e.volatility_regime,
-            o.trade_taken, o.r_multiple
+            m.model_id,
+            MIN(9, CAST(MIN(MAX(m.confidence, 0), 100) / 10 AS INTEGER)) AS bucket,
+            COUNT(*) AS n,
+            SUM(o.r_multiple > 0) AS wins,
+            SUM((m.confidence / 100.0 - (o.r_multiple > 0))
+                * (m.confidence / 100.0 - (o.r_multiple > 0))) AS sq_error
         FROM model_outputs m
         JOIN evaluations e ON m.evaluation_id = e.id
         JOIN outcomes o ON o.evaluation_id = e.id
         WHERE e.prefilter_passed = 1
           AND o.trade_taken = 1
           AND o.r_multiple IS NOT NULL
-          AND e.timestamp >= datetime('now', ? || ' days')
-        ORDER BY e.timestamp DESC
+          AND m.compliant = 1
+          AND m.confidence IS NOT NULL
+          AND e.timestamp >= ?
+        GROUP BY m.model_id, bucket
         """,
-        conn,
-        params=[f"-{days}"],
-        parse_dates=["timestamp"],
+        params=[_cutoff(days)],
     )
-    conn.close()
+    return df
 
-    validate_schema(df, ModelOutput, strict=False)
-    validate_schema(df, Outcome, strict=False)
 
-    return df
+# ── Complete-ensemble Model Outcomes (for agreement analysis) ────────────────
+
+def load_complete_agreement(days: int = 90, n_models: int = 3) -> pd.DataFrame:
+    """
+    Load per-model predictions for scored trades where every model responded.
+
+    One row per (evaluation_id, model_id), with the evaluation-level outcome
+    columns denormalized onto each row. The completeness filter runs in SQL;
+    the number of scored evaluations dropped for missing model outputs is
+    reported in ``df.attrs["incomplete_evaluations"]``.
+    """
+    scored_cte = """
+        WITH scored AS (
+            SELECT e.id AS evaluation_id, e.timestamp, e.ensemble_trade_score, o.r_multiple
+            FROM evaluations e
+            JOIN outcomes o ON o.evaluation_id = e.id
+            WHERE e.prefilter_passed = 1
+              AND o.trade_taken = 1
+              AND o.r_multiple IS NOT NULL
+              AND e.timestamp >= ?
+        ),
+        model_counts AS (
+            SELECT m.evaluation_id, COUNT(DISTINCT m.model_id) AS n_models
+            FROM model_outputs m
+            JOIN scored s ON s.evaluation_id = m.evaluation_id
+            GROUP BY m.evaluation_id
+        )
+    """
+    params = [_cutoff(days), n_models]
+    df = _read_sql(
+        f"""
+        {scored_cte}
+        SELECT
+            m.evaluation_id, m.model_id,
+            m.trade_score, m.should_trade,
+            s.r_multiple, s.ensemble_trade_score, {_epoch_ms("s.timestamp", "timestamp")}
+        FROM model_outputs m
+        JOIN scored s ON s.evaluation_id = m.evaluation_id
+        JOIN model_counts c ON c.evaluation_id = m.evaluation_id
+        WHERE c.n_models = ?
+        ORDER BY s.timestamp DESC
+        """,
+        params=params,
+        parse_dates=["timestamp"],
+    )
+    incomplete = _read_sql(
+        f"{scored_cte} SELECT COUNT(*) AS n FROM model_counts WHERE n_models != ?",
+        params=params,
+    )
+
+    df.attrs["incomplete_evaluations"] = int(incomplete["n"].iloc[0])
+    return _narrow_dtypes(df)
 
 
 # ── Weight History ───────────────────────────────────────────────────────────
 
+@_mtime_lru_cache()
 def load_weight_history() -> pd.DataFrame:
     """Load historical weight snapshots."""
-    conn = _connect()
-
     # Use dynamic select for weight history
     select_cols = _build_select_cols(WeightHistory)
 
-    df = pd.read_sql_query(
+    df = _read_sql(
         f"SELECT {select_cols} FROM weight_history ORDER BY created_at DESC",
-        conn,
         parse_dates=["created_at"],
     )
-    conn.close()
     # Parse weights_json into separate columns
     if not df.empty and "weights_json" in df.columns:
-        weights_expanded = df["weights_json"].apply(json.loads).apply(pd.Series)
+        records = [_json_loads(raw) for raw in df["weights_json"].to_numpy()]
+        weights_expanded = pd.DataFrame.from_records(records, index=df.index)
         df = pd.concat([df.drop(columns=["weights_json"]), weights_expanded], axis=1)
 
     validate_schema(df, WeightHistory, exclude=["weights_json"]) # expanded
@@ -348,26 +1064,29 @@ def load_weight_history() -> pd.DataFrame:
 
 # ── Quick summary (for sanity checks) ───────────────────────────────────────
 
-def summary() -> dict:
-    """Quick count of rows in key tables."""
-    conn = _connect()
-    counts = {}
-    for table in [
-        "evaluations", "model_outputs", "outcomes",
-        "orders", "executions", "trade_journal", "weight_history",
-    ]:
-        row = conn.execute(f"SELECT COUNT(*) as n FROM {table}").fetchone()
-        counts[table] = row["n"]
+SUMMARY_TABLES: tuple[str, ...] = (
+    "evaluations", "model_outputs", "outcomes",
+    "orders", "executions", "trade_journal", "weight_history",
+)
 
+# Built once at import: the identical string on every call lets a pooled
+# connection's statement cache reuse the prepared statement.
+_SUMMARY_SQL = " UNION ALL ".join(
+    [f"SELECT '{table}' AS name, COUNT(*) AS n FROM {table}" for table in SUMMARY_TABLES]
     # Outcomes with r_multiple
-    row = conn.execute(
-        "SELECT COUNT(*) as n FROM outcomes WHERE trade_taken = 1 AND r_multiple IS NOT NULL"
-    ).fetchone()
-    counts["scored_trades"] = row["n"]
+    + [
+        "SELECT 'scored_trades' AS name, COUNT(*) AS n FROM outcomes "
+        "WHERE trade_taken = 1 AND r_multiple IS NOT NULL"
+    ]
+)
 
-    conn.close()
-    return counts
 
+@_mtime_lru_cache()
+def summary() -> dict:
+    """Quick count of rows in key tables."""
+    with get_conn() as conn:
+        rows = conn.execute(_SUMMARY_SQL).fetchall()
+    return {row["name"]: row["n"] for row in rows}
 
 if __name__ == "__main__":
     resolved = _resolve_db_path()
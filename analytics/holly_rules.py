@@ -3,19 +3,22 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
 import pandas as pd
-from scipy import stats
+from matplotlib.figure import Figure
+from scipy import special
+
+# Ensure analytics/ is on sys.path for bare imports when run from project root
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from db_loader import READ_PRAGMAS, _cutoff, _json_dumpb  # noqa: E402
 
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR.parent / "data" / "bridge.db"
@@ -24,6 +27,7 @@ JSON_PATH = OUTPUT_DIR / "holly_rules.json"
 PLOT_PATH = OUTPUT_DIR / "holly_rules_by_strategy.png"
 
 MIN_GROUP_SIZE = 10
+TOP_RULES = 10
 FEATURES: tuple[str, ...] = (
     "mfe",
     "mae",
@@ -35,63 +39,83 @@ FEATURES: tuple[str, ...] = (
 )
 
 
+# SELECT order for load_holly_trades; None = text column, otherwise the NumPy dtype.
+HOLLY_COLUMNS: tuple[tuple[str, str | None], ...] = (
+    ("entry_time", None),
+    ("strategy", None),
+    ("segment", None),
+    ("actual_pnl", "float64"),
+    ("mfe", "float64"),
+    ("mae", "float64"),
+    ("hold_minutes", "float64"),
+    ("giveback", "float64"),
+    ("giveback_ratio", "float64"),
+    ("r_multiple", "float64"),
+    ("time_to_mfe_min", "float64"),
+    ("time_to_mae_min", "float64"),
+    ("entry_price", "float64"),
+    ("exit_price", "float64"),
+    ("shares", "float64"),
+)
+
+
+def _column_array(rows: list[tuple], idx: int, dtype: str | None) -> np.ndarray:
+    """One result column as a typed array (NULL -> NaN for numeric columns)."""
+    if dtype is None:
+        return np.fromiter((row[idx] for row in rows), dtype=object, count=len(rows))
+    try:
+        return np.fromiter(
+            (np.nan if row[idx] is None else row[idx] for row in rows), dtype=dtype, count=len(rows)
+        )
+    except (TypeError, ValueError):
+        # SQLite allows text in REAL columns; coerce those cells to NaN.
+        return pd.to_numeric(pd.Series([row[idx] for row in rows], dtype=object), errors="coerce").to_numpy(
+            dtype=dtype
+        )
+
+
 def load_holly_trades(days: int) -> pd.DataFrame:
     """Load Holly trades from SQLite for the requested lookback window."""
     if not DB_PATH.exists():
         return pd.DataFrame()
 
-    conn = sqlite3.connect(DB_PATH)
+    # Read-only, autocommit, with db_loader's read PRAGMAs (mmap, large page cache, query_only).
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, isolation_level=None)
     try:
-        query = """
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        select_cols = ",\n            ".join(name for name, _ in HOLLY_COLUMNS)
+        query = f"""
         SELECT
-            entry_time,
-            strategy,
-            segment,
-            actual_pnl,
-            mfe,
-            mae,
-            hold_minutes,
-            giveback,
-            giveback_ratio,
-            r_multiple,
-            time_to_mfe_min,
-            time_to_mae_min,
-            entry_price,
-            exit_price,
-            shares
+            {select_cols}
         FROM holly_trades
-        WHERE datetime(entry_time) >= datetime('now', ? || ' days')
+        WHERE entry_time >= ?
         """
-        return pd.read_sql_query(query, conn, params=[f"-{days}"])
+        # Bare column vs a bound 'YYYY-MM-DD HH:MM:SS' cutoff (the stored format), so
+        # SQLite can range-scan idx_holly_trades_entry_time.
+        rows = conn.execute(query, [_cutoff(days)]).fetchall()
     except sqlite3.OperationalError as exc:
         print(f"Failed to query holly_trades: {exc}")
         return pd.DataFrame()
     finally:
         conn.close()
 
+    # Typed column arrays straight from the cursor rows, skipping read_sql_query's inference.
+    return pd.DataFrame(
+        {name: _column_array(rows, idx, dtype) for idx, (name, dtype) in enumerate(HOLLY_COLUMNS)}
+    )
 
-def cohens_d(group1: pd.Series, group2: pd.Series) -> float:
-    """Compute Cohen's d effect size between two numeric groups."""
-    clean1 = pd.to_numeric(group1, errors="coerce").dropna()
-    clean2 = pd.to_numeric(group2, errors="coerce").dropna()
-
-    n1 = len(clean1)
-    n2 = len(clean2)
-    if n1 < 2 or n2 < 2:
-        return 0.0
-
-    var1 = float(clean1.var(ddof=1))
-    var2 = float(clean2.var(ddof=1))
-
-    denominator = n1 + n2 - 2
-    if denominator <= 0:
-        return 0.0
-
-    pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / denominator)
-    if pooled_std <= 0 or not np.isfinite(pooled_std):
-        return 0.0
 
-    return float((clean1.mean() - clean2.mean()) / pooled_std)
+def _column_stats(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-column non-NaN count, mean and sample variance (ddof=1) of a 2-D float64 array."""
+    # Two passes (mean, then centered squares); NaN cells are left out of every column.
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(present, values, 0.0).sum(axis=0) / counts
+        centered = np.where(present, values - means, 0.0)
+        variances = (centered * centered).sum(axis=0) / (counts - 1)
+    return counts, means, variances
 
 
 def _safe_float(value: float | np.floating | None) -> float | None:
@@ -106,47 +130,75 @@ def _safe_float(value: float | np.floating | None) -> float | None:
 def build_effect_rows(df: pd.DataFrame) -> tuple[list[dict[str, float | int | str | None]], list[str]]:
     """Build Cohen's d rows for winner vs loser feature comparison."""
     warnings: list[str] = []
-    winners = df[df["winner"]]
-    losers = df[~df["winner"]]
+    is_winner = df["winner"].to_numpy(dtype=bool)
+    n_winners = int(is_winner.sum())
+    n_losers = len(is_winner) - n_winners
 
-    if len(winners) < MIN_GROUP_SIZE or len(losers) < MIN_GROUP_SIZE:
+    if n_winners < MIN_GROUP_SIZE or n_losers < MIN_GROUP_SIZE:
         warnings.append(
             "Insufficient winners/losers split for effect-size analysis "
-            f"(winners={len(winners)}, losers={len(losers)}, need >= {MIN_GROUP_SIZE} each)."
+            f"(winners={n_winners}, losers={n_losers}, need >= {MIN_GROUP_SIZE} each)."
         )
         return [], warnings
 
-    rows: list[dict[str, float | int | str | None]] = []
-    for feature in FEATURES:
-        winner_vals = pd.to_numeric(winners[feature], errors="coerce").dropna()
-        loser_vals = pd.to_numeric(losers[feature], errors="coerce").dropna()
-
-        if len(winner_vals) < MIN_GROUP_SIZE or len(loser_vals) < MIN_GROUP_SIZE:
-            warnings.append(
-                f"Skipping feature '{feature}' due to insufficient data "
-                f"(winners={len(winner_vals)}, losers={len(loser_vals)}, need >= {MIN_GROUP_SIZE} each)."
-            )
-            continue
+    # All features as one float matrix: means, variances and counts for every feature
+    # come from a single pass per group rather than a to_numeric/dropna per feature.
+    values = df[list(FEATURES)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    win_vals = values[is_winner]
+    loss_vals = values[~is_winner]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_n, win_mean, win_var = _column_stats(win_vals)
+        loss_n, loss_mean, loss_var = _column_stats(loss_vals)
+
+        dof = win_n + loss_n - 2
+        pooled_var = ((win_n - 1) * win_var + (loss_n - 1) * loss_var) / dof
+        pooled_std = np.sqrt(pooled_var)
+        diff = win_mean - loss_mean
+        effect = np.where((pooled_std > 0) & np.isfinite(pooled_std), diff / pooled_std, 0.0)
+        # Student's t with pooled variance, as ttest_ind(equal_var=True); two-sided p from
+        # the t CDF ufunc directly (stats.t.sf adds per-call argument checking on top).
+        t_stat = diff / np.sqrt(pooled_var * (1.0 / win_n + 1.0 / loss_n))
+        p_value = 2.0 * special.stdtr(dof, -np.abs(t_stat))
+
+    eligible = (win_n >= MIN_GROUP_SIZE) & (loss_n >= MIN_GROUP_SIZE)
+    for idx in np.flatnonzero(~eligible):
+        warnings.append(
+            f"Skipping feature '{FEATURES[idx]}' due to insufficient data "
+            f"(winners={int(win_n[idx])}, losers={int(loss_n[idx])}, need >= {MIN_GROUP_SIZE} each)."
+        )
 
-        effect = cohens_d(winner_vals, loser_vals)
-        t_stat, p_value = stats.ttest_ind(winner_vals, loser_vals, equal_var=True)
+    # Top rules by |d| (ties keep feature order); with only len(FEATURES) candidates a plain sort is enough.
+    candidates = np.flatnonzero(eligible)
+    abs_effect = np.abs(effect[candidates])
+    abs_effect[~np.isfinite(abs_effect)] = 0.0
+    top = candidates[np.lexsort((candidates, -abs_effect))][:TOP_RULES]
+
+    rows: list[dict[str, float | int | str | None]] = [
+        {
+            "feature": FEATURES[idx],
+            "cohens_d": _safe_float(effect[idx]),
+            "abs_cohens_d": _safe_float(abs(effect[idx])),
+            "winner_mean": _safe_float(win_mean[idx]),
+            "loser_mean": _safe_float(loss_mean[idx]),
+            "winner_n": int(win_n[idx]),
+            "loser_n": int(loss_n[idx]),
+            "t_stat": _safe_float(t_stat[idx]),
+            "p_value": _safe_float(p_value[idx]),
+        }
+        for idx in top
+    ]
+    return rows, warnings
 
-        rows.append(
-            {
-                "feature": feature,
-                "cohens_d": _safe_float(effect),
-                "abs_cohens_d": _safe_float(abs(effect)),
-                "winner_mean": _safe_float(winner_vals.mean()),
-                "loser_mean": _safe_float(loser_vals.mean()),
-                "winner_n": int(len(winner_vals)),
-                "loser_n": int(len(loser_vals)),
-                "t_stat": _safe_float(t_stat),
-                "p_value": _safe_float(p_value),
-            }
-        )
 
-    rows.sort(key=lambda item: float(item["abs_cohens_d"] or 0.0), reverse=True)
-    return rows[:10], warnings
+def _group_nanmean(codes: np.ndarray, values: pd.Series, n_groups: int) -> np.ndarray:
+    """Per-group mean of a numeric column, ignoring NaN (NaN for groups with no values)."""
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    present = ~np.isnan(numeric)
+    sums = np.bincount(codes[present], weights=numeric[present], minlength=n_groups)
+    counts = np.bincount(codes[present], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
 
 
 def build_strategy_summary(df: pd.DataFrame) -> tuple[list[dict[str, float | int | str | None]], list[str]]:
@@ -154,23 +206,32 @@ def build_strategy_summary(df: pd.DataFrame) -> tuple[list[dict[str, float | int
     warnings: list[str] = []
     rows: list[dict[str, float | int | str | None]] = []
 
-    grouped = df.groupby("strategy", dropna=False)
-    for strategy, group in grouped:
+    # One factorize + bincount pass per metric instead of a pandas group object per strategy.
+    # sort=True / NaN last matches groupby(dropna=False) ordering.
+    codes, uniques = pd.factorize(df["strategy"], sort=True, use_na_sentinel=False)
+    n_groups = len(uniques)
+    counts = np.bincount(codes, minlength=n_groups)
+    wins = np.bincount(codes, weights=df["winner"].to_numpy(dtype=np.float64), minlength=n_groups)
+    avg_r = _group_nanmean(codes, df["r_multiple"], n_groups)
+    avg_giveback = _group_nanmean(codes, df["giveback_ratio"], n_groups)
+
+    for idx, strategy in enumerate(uniques):
         strategy_name = str(strategy) if pd.notna(strategy) and str(strategy).strip() else "(unknown)"
-        if len(group) < MIN_GROUP_SIZE:
+        n = int(counts[idx])
+        if n < MIN_GROUP_SIZE:
             warnings.append(
                 f"Skipping strategy '{strategy_name}' due to insufficient data "
-                f"(n={len(group)}, need >= {MIN_GROUP_SIZE})."
+                f"(n={n}, need >= {MIN_GROUP_SIZE})."
             )
             continue
 
         rows.append(
             {
                 "strategy": strategy_name,
-                "n": int(len(group)),
-                "win_rate": _safe_float(float(group["winner"].mean())),
-                "avg_r_multiple": _safe_float(pd.to_numeric(group["r_multiple"], errors="coerce").mean()),
-                "avg_giveback_ratio": _safe_float(pd.to_numeric(group["giveback_ratio"], errors="coerce").mean()),
+                "n": n,
+                "win_rate": _safe_float(wins[idx] / n),
+                "avg_r_multiple": _safe_float(avg_r[idx]),
+                "avg_giveback_ratio": _safe_float(avg_giveback[idx]),
             }
         )
 
@@ -179,15 +240,19 @@ def build_strategy_summary(df: pd.DataFrame) -> tuple[list[dict[str, float | int
 
 
 def plot_strategy_win_rates(strategy_rows: list[dict[str, float | int | str | None]]) -> None:
-    """Save a bar chart of strategy win rates."""
+    """
+    Save a bar chart of strategy win rates.
+
+    Builds a standalone Figure (no pyplot state), so it can render on a worker thread.
+    """
     if not strategy_rows:
-        print("No strategy groups met minimum sample size; skipping win-rate chart.")
         return
 
     chart_df = pd.DataFrame(strategy_rows)
     chart_df = chart_df.sort_values("win_rate", ascending=False)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
     ax.bar(chart_df["strategy"], chart_df["win_rate"] * 100.0, color="#10b981")
     ax.set_title("Holly Strategy Win Rate")
     ax.set_ylabel("Win Rate (%)")
@@ -198,7 +263,6 @@ def plot_strategy_win_rates(strategy_rows: list[dict[str, float | int | str | No
 
     fig.tight_layout()
     fig.savefig(PLOT_PATH, dpi=150)
-    plt.close(fig)
 
 
 def print_summary(
@@ -266,12 +330,11 @@ def run(days: int) -> None:
             "strategy_summary": [],
             "warnings": ["No rows available for analysis."],
         }
-        with open(JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump(payload, file, indent=2)
+        JSON_PATH.write_bytes(_json_dumpb(payload, indent=True))
         return
 
     df["winner"] = pd.to_numeric(df["actual_pnl"], errors="coerce") > 0
-    valid = df[df["actual_pnl"].notna()].copy()
+    valid = df[df["actual_pnl"].notna()]
 
     if len(valid) < MIN_GROUP_SIZE:
         message = f"Only {len(valid)} rows have actual_pnl in last {days} days; need at least {MIN_GROUP_SIZE}."
@@ -287,15 +350,34 @@ def run(days: int) -> None:
             "strategy_summary": [],
             "warnings": [message],
         }
-        with open(JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump(payload, file, indent=2)
+        JSON_PATH.write_bytes(_json_dumpb(payload, indent=True))
         return
 
     effect_rows, effect_warnings = build_effect_rows(valid)
     strategy_rows, strategy_warnings = build_strategy_summary(valid)
 
-    plot_strategy_win_rates(strategy_rows)
+    if not strategy_rows:
+        print("No strategy groups met minimum sample size; skipping win-rate chart.")
+
+    # Render the chart on a worker thread while the summary and JSON are produced.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        chart = pool.submit(plot_strategy_win_rates, strategy_rows)
+        _report(valid, days, effect_rows, effect_warnings, strategy_rows, strategy_warnings)
+        chart.result()
+
+    if PLOT_PATH.exists():
+        print(f"Saved chart: {PLOT_PATH}")
+
 
+def _report(
+    valid: pd.DataFrame,
+    days: int,
+    effect_rows: list[dict[str, float | int | str | None]],
+    effect_warnings: list[str],
+    strategy_rows: list[dict[str, float | int | str | None]],
+    strategy_warnings: list[str],
+) -> None:
+    """Print the console summary and write the JSON payload."""
     winners = int(valid["winner"].sum())
     losers = int((~valid["winner"]).sum())
 
@@ -324,12 +406,9 @@ def run(days: int) -> None:
         "warnings": all_warnings,
     }
 
-    with open(JSON_PATH, "w", encoding="utf-8") as file:
-        json.dump(payload, file, indent=2)
+    JSON_PATH.write_bytes(_json_dumpb(payload, indent=True))
 
     print(f"\nSaved JSON: {JSON_PATH}")
-    if PLOT_PATH.exists():
-        print(f"Saved chart: {PLOT_PATH}")
 
 
 def main() -> None:
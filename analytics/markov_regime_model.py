@@ -26,35 +26,61 @@ class MarketRegimeHMM:
             random_state=42
         )
         self.is_fitted = False
+        self.scaler_mean = None
+        self.scaler_std = None
 
     def prepare_features(self, df: pd.DataFrame) -> np.ndarray:
         """
-        Feature Engineering for HMM.
+        Feature Engineering for HMM (training path: fits the scaler to df).
         We use Log Returns and Range Volatility as the primary observations.
         """
-        df = df.copy()
-        
+        return self._standardize(self._engineer_features(df), fit=True)
+
+    def _engineer_features(self, df: pd.DataFrame) -> np.ndarray:
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+
         # 1. Log Returns
-        df['log_ret'] = np.log(df['close'] / df['close'].shift(1))
-        
+        log_ret = np.empty_like(close)
+        log_ret[:1] = np.nan
+        np.log(close[1:] / close[:-1], out=log_ret[1:])
+
         # 2. Parkinson Volatility (High-Low range based)
         # Using a rolling window to smooth it slightly
+        # (per-bar sigma = |ln(H/L)| / sqrt(4 ln 2), then averaged over the window)
         window = 10
-        df['parkinson_vol'] = np.sqrt(
-            (1.0 / (4.0 * np.log(2.0))) * np.log(df['high'] / df['low'])**2
-        ).rolling(window=window).mean()
+        per_bar_vol = np.log(high / low)
+        np.abs(per_bar_vol, out=per_bar_vol)
+        per_bar_vol *= 1.0 / np.sqrt(4.0 * np.log(2.0))
+        parkinson_vol = pd.Series(per_bar_vol).rolling(window=window).mean().to_numpy()
+
+        # Drop rows where either feature is NaN (warm-up window, gaps)
+        # float32 observations: half the bytes through standardization and the HMM passes
+        X = np.column_stack((log_ret, parkinson_vol)).astype(np.float32)
+        X = X[~np.isnan(X).any(axis=1)]
 
-        # Drop NaN
-        df.dropna(inplace=True)
+        return X
 
-        # Standardization (Z-Score)
+    def _standardize(self, X: np.ndarray, fit: bool = False) -> np.ndarray:
+        """
+        Z-score X in place. fit=True sets the scaler from X; otherwise the
+        training scaler is reused. A model loaded without a saved scaler
+        standardizes each batch on its own moments and stores nothing.
+        """
         # Critical for HMM convergence
-        X = df[['log_ret', 'parkinson_vol']].values
-        self.scaler_mean = X.mean(axis=0)
-        self.scaler_std = X.std(axis=0)
-        X_scaled = (X - self.scaler_mean) / self.scaler_std
-        
-        return X_scaled
+        # (moments accumulated in float64, applied as float32)
+        if fit or self.scaler_mean is None:
+            mean = X.mean(axis=0, dtype=np.float64).astype(np.float32)
+            std = X.std(axis=0, dtype=np.float64).astype(np.float32)
+            if fit:
+                self.scaler_mean, self.scaler_std = mean, std
+        else:
+            mean, std = self.scaler_mean, self.scaler_std
+        np.subtract(X, mean, out=X)
+        np.divide(X, std, out=X)
+
+        return X
 
     def fit(self, df: pd.DataFrame):
         logger.info("Preparing features...")
@@ -97,16 +123,33 @@ class MarketRegimeHMM:
         if not self.is_fitted:
             raise ValueError("Model not fitted yet.")
             
-        X = self.prepare_features(df)
+        # Inference path: reuse the scaler fitted in fit() (or saved with the model)
+        X = self._standardize(self._engineer_features(df))
         hidden_states = self.model.predict(X)
         return hidden_states
 
     def save(self, path: str):
-        joblib.dump(self.model, path)
+        # The training scaler travels with the HMM so a loaded model standardizes
+        # inputs exactly as fit() did.
+        # Uncompressed, pickle protocol 5: fitted parameter arrays are written as raw buffers
+        state = {
+            "model": self.model,
+            "scaler_mean": self.scaler_mean,
+            "scaler_std": self.scaler_std,
+        }
+        joblib.dump(state, path, compress=0, protocol=5)
         logger.info(f"Model saved to {path}")
 
     def load(self, path: str):
-        self.model = joblib.load(path)
+        state = joblib.load(path)
+        if isinstance(state, dict):
+            self.model = state["model"]
+            self.scaler_mean = state["scaler_mean"]
+            self.scaler_std = state["scaler_std"]
+        else:
+            # Files saved before the scaler was persisted hold the bare HMM
+            self.model = state
+            self.scaler_mean = self.scaler_std = None
         self.is_fitted = True
         logger.info(f"Model loaded from {path}")
 
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import argparse
-import json
+import atexit
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,7 +14,7 @@ import pandas as pd
 # Ensure analytics/ is on sys.path for bare imports when run from project root
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from db_loader import ANALYTICS_DIR, load_evaluations, load_model_outcomes, load_weights, save_weights, insert_weight_history
+from db_loader import ANALYTICS_DIR, _json_dumps, _widen_scores, load_evaluations, load_model_outcomes, load_weights, save_weights, insert_weight_history
 
 MODEL_IDS: tuple[str, ...] = ("claude", "gpt4o", "gemini")
 MIN_SAMPLE_SIZE = 50
@@ -22,22 +22,56 @@ OUTPUT_DIR = ANALYTICS_DIR / "output"
 AUDIT_LOG_PATH = OUTPUT_DIR / "weight_updates.jsonl"
 
 
-def _safe_mean(series: pd.Series) -> float:
-    if series.empty:
-        return 0.0
-    return float(series.mean())
+def _group_mean(codes: np.ndarray, values: np.ndarray, mask: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Per-group NaN-skipping mean of values[mask].
+
+    0.0 for groups with no masked rows; NaN when every masked value is missing.
+    """
+    present = mask & ~np.isnan(values)
+    sums = np.bincount(codes, weights=np.where(present, values, 0.0), minlength=n_groups)
+    n_present = np.bincount(codes, weights=present, minlength=n_groups)
+    members = np.bincount(codes, weights=mask, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(members > 0, sums / n_present, 0.0)
 
 
 def compute_model_metrics(df: pd.DataFrame) -> dict[str, dict[str, float | int]]:
     """Compute requested per-model metrics from compliant rows."""
     metrics: dict[str, dict[str, float | int]] = {}
 
-    for model_id in MODEL_IDS:
-        model_all = df[df["model_id"] == model_id].copy()
-        compliant_df = model_all[model_all["compliant"] == 1].copy()
+    # Factorize model_id once; every per-model figure over the compliant rows is then
+    # a bincount over the codes instead of a string comparison per model.
+    # Rows are selected with one index array; no filtered DataFrame is built.
+    codes, uniques = pd.factorize(df["model_id"])
+    rows = np.flatnonzero((df["compliant"].to_numpy() == 1) & (codes >= 0))
+    codes = codes[rows]
+    position = {model_id: idx for idx, model_id in enumerate(uniques)}
+    n_groups = len(uniques)
+
+    def numeric(column: str) -> np.ndarray:
+        return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)[rows]
+
+    r_multiple = numeric("r_multiple")
+    trade_score = numeric("trade_score")
+    probs = np.clip(numeric("confidence"), 0.0, 100.0) / 100.0
+    is_win = r_multiple > 0
+    is_loss = r_multiple <= 0
+    is_trade = df["should_trade"].to_numpy()[rows] == 1
+
+    counts = np.bincount(codes, minlength=n_groups)
+    trade_counts = np.bincount(codes, weights=is_trade, minlength=n_groups)
+    trade_wins = np.bincount(codes, weights=is_trade & is_win, minlength=n_groups)
+    # np.mean semantics: a missing confidence makes the model's Brier score NaN.
+    brier_by_model = np.bincount(codes, weights=(probs - is_win) ** 2, minlength=n_groups) / np.maximum(counts, 1)
+    avg_r_by_model = _group_mean(codes, r_multiple, is_trade, n_groups)
+    win_score_by_model = _group_mean(codes, trade_score, is_win, n_groups)
+    loss_score_by_model = _group_mean(codes, trade_score, is_loss, n_groups)
 
-        compliant_count = int(len(compliant_df))
-        if compliant_count == 0:
+    for model_id in MODEL_IDS:
+        idx = position.get(model_id)
+        # Models whose rows are all non-compliant are factorized too but own no rows.
+        if idx is None or counts[idx] == 0:
             metrics[model_id] = {
                 "compliant_count": 0,
                 "trade_prediction_count": 0,
@@ -52,23 +86,16 @@ def compute_model_metrics(df: pd.DataFrame) -> dict[str, dict[str, float | int]]
             }
             continue
 
-        trade_predictions = compliant_df[compliant_df["should_trade"] == 1].copy()
-        win_series = (compliant_df["r_multiple"] > 0).astype(float)
+        compliant_count = int(counts[idx])
+        trade_count = int(trade_counts[idx])
+        accuracy = float(trade_wins[idx] / trade_count) if trade_count > 0 else 0.0
 
-        predicted_trade_wins = trade_predictions[trade_predictions["r_multiple"] > 0]
-        trade_count = int(len(trade_predictions))
-        accuracy = float(len(predicted_trade_wins) / trade_count) if trade_count > 0 else 0.0
+        brier = float(brier_by_model[idx])
 
-        probs = compliant_df["confidence"].astype(float).clip(lower=0.0, upper=100.0) / 100.0
-        brier = float(np.mean((probs - win_series) ** 2))
+        avg_r = float(avg_r_by_model[idx])
 
-        avg_r = _safe_mean(trade_predictions["r_multiple"].astype(float))
-
-        wins = compliant_df[compliant_df["r_multiple"] > 0]
-        losses = compliant_df[compliant_df["r_multiple"] <= 0]
-
-        avg_score_on_wins = _safe_mean(wins["trade_score"].astype(float))
-        avg_score_on_losses = _safe_mean(losses["trade_score"].astype(float))
+        avg_score_on_wins = float(win_score_by_model[idx])
+        avg_score_on_losses = float(loss_score_by_model[idx])
 
         discrimination = avg_score_on_wins - avg_score_on_losses
         discrimination_ratio = avg_score_on_wins / max(avg_score_on_losses, 1.0)
@@ -110,31 +137,32 @@ def normalize_weights(metrics: dict[str, dict[str, float | int]]) -> dict[str, f
 
     normalized = {model_id: raw[model_id] / total for model_id in MODEL_IDS}
 
-    # Remove tiny floating error by re-normalizing.
-    norm_total = sum(normalized.values())
-    if norm_total > 0:
-        normalized = {model_id: value / norm_total for model_id, value in normalized.items()}
+    # Single pass; the largest weight absorbs any rounding residual so the sum is exactly 1.0
+    # (a zero-score model keeps exactly 0.0).
+    largest = max(MODEL_IDS, key=normalized.__getitem__)
+    normalized[largest] = 1.0 - sum(value for model_id, value in normalized.items() if model_id != largest)
 
     return normalized
 
 
 def compute_k(sample_df: pd.DataFrame, days: int) -> tuple[float, float]:
     """Compute disagreement penalty k based on spread-to-outcome correlation."""
-    evals = load_evaluations(days=days)
-    spread = evals[["id", "ensemble_score_spread"]].copy()
-
-    merged = sample_df[["evaluation_id", "r_multiple"]].drop_duplicates().merge(
-        spread,
-        how="left",
-        left_on="evaluation_id",
-        right_on="id",
+    # Only the two columns the correlation needs; load_evaluations memoizes per DB snapshot.
+    evals = load_evaluations(days=days, columns=["id", "ensemble_score_spread"])
+    spread_by_id = pd.Series(
+        evals["ensemble_score_spread"].to_numpy(dtype=np.float64), index=evals["id"].to_numpy()
     )
 
-    merged = merged.dropna(subset=["ensemble_score_spread", "r_multiple"])
-    if len(merged) < 2:
+    pairs = sample_df[["evaluation_id", "r_multiple"]].drop_duplicates()
+    spread = spread_by_id.reindex(pairs["evaluation_id"].to_numpy()).to_numpy()
+    r_multiple = pd.to_numeric(pairs["r_multiple"], errors="coerce").to_numpy(dtype=np.float64)
+
+    present = ~(np.isnan(spread) | np.isnan(r_multiple))
+    if int(present.sum()) < 2:
         return 0.0, 1.0
 
-    corr = float(merged["ensemble_score_spread"].corr(merged["r_multiple"]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = float(np.corrcoef(spread[present], r_multiple[present])[0, 1])
     if np.isnan(corr):
         corr = 0.0
 
@@ -169,14 +197,25 @@ def print_comparison(
     print(f"Sample size: {sample_size} scored trades")
 
 
+_AUDIT_FILE = None
+
+
+def _audit_file():
+    """Append handle for AUDIT_LOG_PATH, opened on first use and flushed/closed at exit."""
+    global _AUDIT_FILE
+    if _AUDIT_FILE is None:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        _AUDIT_FILE = open(AUDIT_LOG_PATH, "a", encoding="utf-8", buffering=64 * 1024)
+        atexit.register(_AUDIT_FILE.close)
+    return _AUDIT_FILE
+
+
 def append_audit(
     old_weights: dict,
     new_payload: dict,
     metrics_per_model: dict[str, dict[str, float | int]],
     sample_size: int,
 ) -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
     record = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "old_weights": old_weights,
@@ -185,8 +224,7 @@ def append_audit(
         "sample_size": sample_size,
     }
 
-    with open(AUDIT_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record) + "\n")
+    _audit_file().write(_json_dumps(record) + "\n")
 
 
 def main() -> None:
@@ -195,8 +233,9 @@ def main() -> None:
     parser.add_argument("--days", type=int, default=180, help="Lookback window in days (default: 180)")
     args = parser.parse_args()
 
-    outcomes = load_model_outcomes(days=args.days)
-    outcomes = outcomes[outcomes["r_multiple"].notna()].copy()
+    # Scores/confidences back to float64 so metrics and the audit log use the stored values
+    outcomes = _widen_scores(load_model_outcomes(days=args.days))
+    outcomes = outcomes[outcomes["r_multiple"].notna()]
 
     sample_size = int(outcomes["evaluation_id"].nunique())
     current_weights = load_weights()
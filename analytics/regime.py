@@ -10,7 +10,6 @@ Produces:
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from datetime import datetime, timezone
@@ -19,14 +18,13 @@ from pathlib import Path
 # Ensure analytics/ is on sys.path for bare imports when run from project root
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
 import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 
-from db_loader import load_eval_outcomes
+from db_loader import _json_dumpb, _widen_scores, load_eval_outcomes
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "output"
 JSON_PATH = OUTPUT_DIR / "regime_analysis.json"
@@ -43,6 +41,11 @@ TIME_OF_DAY_ORDER = [
     "after_hours",
 ]
 LIQUIDITY_ORDER = ["thin", "normal", "thick"]
+REGIME_ORDERS = {
+    "volatility_regime": VOLATILITY_ORDER,
+    "time_of_day": TIME_OF_DAY_ORDER,
+    "liquidity_bucket": LIQUIDITY_ORDER,
+}
 
 
 def _to_float(value: float | int | np.floating | np.integer | None) -> float | None:
@@ -51,12 +54,15 @@ def _to_float(value: float | int | np.floating | np.integer | None) -> float | N
     return float(value)
 
 
-def _single_dimension_breakdown(df: pd.DataFrame, column: str, order: list[str]) -> pd.DataFrame:
-    working = df.copy()
-    working["is_win"] = (working["r_multiple"] > 0).astype(int)
+def _single_dimension_breakdown(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Per-bucket stats for one regime column.
 
+    df carries the is_win flag and the categorical regime columns set in main(), so
+    groupby(observed=False) yields every bucket in REGIME_ORDERS order, empty ones included.
+    """
     grouped = (
-        working.groupby(column, dropna=False)
+        df.groupby(column, observed=False)
         .agg(
             win_rate=("is_win", "mean"),
             avg_r_multiple=("r_multiple", "mean"),
@@ -67,58 +73,80 @@ def _single_dimension_breakdown(df: pd.DataFrame, column: str, order: list[str])
     )
 
     grouped["win_rate"] = grouped["win_rate"] * 100.0
-    grouped = grouped.set_index(column).reindex(order).reset_index()
-
-    grouped["count"] = grouped["count"].fillna(0).astype(int)
+    grouped["count"] = grouped["count"].astype(int)
     return grouped
 
 
-def _print_breakdown(title: str, table: pd.DataFrame, dimension_col: str) -> None:
-    display_df = table.copy()
-    display_df["win_rate"] = display_df["win_rate"].map(
-        lambda v: "-" if pd.isna(v) else f"{v:.1f}%"
-    )
-    display_df["avg_r_multiple"] = display_df["avg_r_multiple"].map(
-        lambda v: "-" if pd.isna(v) else f"{v:.3f}"
-    )
-    display_df["avg_confidence"] = display_df["avg_confidence"].map(
-        lambda v: "-" if pd.isna(v) else f"{v:.2f}"
-    )
+def _format_column(values: pd.Series, fmt: str) -> np.ndarray:
+    """printf-format a float column in one array op; NaN (empty bucket) shows as "-"."""
+    arr = values.to_numpy(dtype=float)
+    return np.where(np.isnan(arr), "-", np.char.mod(fmt, arr))
 
-    print(f"\n{title}")
-    print(display_df[[dimension_col, "win_rate", "avg_r_multiple", "avg_confidence", "count"]].to_string(index=False))
 
+def _render_table(columns: dict[str, list[str]]) -> str:
+    """
+    Fixed-width text table from pre-formatted string columns: first column (the labels)
+    left-aligned, the rest right-aligned, two-space gutters. Replaces DataFrame.to_string
+    for these few-row tables.
+    """
+    names = list(columns)
+    widths = [max(len(name), *(len(cell) for cell in cells)) for name, cells in columns.items()]
+    lines = []
+    for first, *rest in [names, *zip(*columns.values())]:
+        lines.append("  ".join([first.ljust(widths[0])] + [cell.rjust(w) for cell, w in zip(rest, widths[1:])]))
+    return "\n".join(line.rstrip() for line in lines)
 
-def _build_crosstab(df: pd.DataFrame, row_col: str, col_col: str, row_order: list[str], col_order: list[str]) -> dict:
-    working = df.copy()
-    working["is_win"] = (working["r_multiple"] > 0).astype(int)
 
-    count_matrix = (
-        working.pivot_table(index=row_col, columns=col_col, values="r_multiple", aggfunc="count")
-        .reindex(index=row_order, columns=col_order)
-        .fillna(0)
-        .astype(int)
+def _print_breakdown(title: str, table: pd.DataFrame, dimension_col: str) -> None:
+    text = _render_table(
+        {
+            dimension_col: [str(label) for label in table[dimension_col]],
+            "win_rate": list(_format_column(table["win_rate"], "%.1f%%")),
+            "avg_r_multiple": list(_format_column(table["avg_r_multiple"], "%.3f")),
+            "avg_confidence": list(_format_column(table["avg_confidence"], "%.2f")),
+            "count": [str(n) for n in table["count"].to_numpy()],
+        }
     )
+    print(f"\n{title}\n{text}")
+
 
-    win_matrix = (
-        working.pivot_table(index=row_col, columns=col_col, values="is_win", aggfunc="mean")
-        .reindex(index=row_order, columns=col_order)
-        * 100.0
+def _regime_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sample count, row count and wins per (volatility, time of day, liquidity) cell: the
+    one scan of df that every cross-tab is marginalized from.
+
+    dropna=False keeps rows with a missing label in one key, so they still count towards
+    the cross-tabs that don't use that key.
+    """
+    return df.groupby(list(REGIME_ORDERS), observed=True, dropna=False).agg(
+        n=("r_multiple", "count"),
+        rows=("is_win", "size"),
+        wins=("is_win", "sum"),
     )
 
-    display_matrix = pd.DataFrame(index=row_order, columns=col_order, dtype=object)
-    for row in row_order:
-        for col in col_order:
-            n_value = int(count_matrix.loc[row, col])
-            if n_value < 5:
-                display_matrix.loc[row, col] = "insufficient data"
-                continue
 
-            win_rate = win_matrix.loc[row, col]
-            if pd.isna(win_rate):
-                display_matrix.loc[row, col] = "insufficient data"
-            else:
-                display_matrix.loc[row, col] = f"{win_rate:.1f}% (n={n_value})"
+def _build_crosstab(cube: pd.DataFrame, row_col: str, col_col: str, row_order: list[str], col_order: list[str]) -> dict:
+    # Marginalize the regime cube onto the two keys, then labels for the whole grid at once.
+    # count is of r_multiple (open trades with no result yet are not samples); the win rate
+    # is over every row in the cell, as is_win.mean() would give.
+    cells = cube.groupby(level=[row_col, col_col], observed=True).sum()
+    cells["win"] = cells["wins"] / cells["rows"]
+    count_matrix = (
+        cells["n"].unstack(col_col).reindex(index=row_order, columns=col_order).fillna(0).astype(int)
+    )
+    win_matrix = cells["win"].unstack(col_col).reindex(index=row_order, columns=col_order) * 100.0
+
+    counts = count_matrix.to_numpy()
+    rates = win_matrix.to_numpy(dtype=float)
+    labels = np.array(
+        [f"{rate:.1f}% (n={n})" for rate, n in zip(rates.ravel(), counts.ravel())], dtype=object
+    ).reshape(counts.shape)
+    display_matrix = pd.DataFrame(
+        np.where((counts >= 5) & ~np.isnan(rates), labels, "insufficient data"),
+        index=row_order,
+        columns=col_order,
+        dtype=object,
+    )
 
     return {
         "win_rate_pct": win_matrix,
@@ -128,8 +156,10 @@ def _build_crosstab(df: pd.DataFrame, row_col: str, col_col: str, row_order: lis
 
 
 def _print_crosstab(title: str, crosstab_data: dict) -> None:
-    print(f"\n{title}")
-    print(crosstab_data["display"].to_string())
+    display = crosstab_data["display"]
+    columns = {"": [str(label) for label in display.index]}
+    columns.update({str(col): list(display[col].to_numpy()) for col in display.columns})
+    print(f"\n{title}\n{_render_table(columns)}")
 
 
 def _save_heatmap(win_rate_matrix: pd.DataFrame, count_matrix: pd.DataFrame) -> None:
@@ -138,20 +168,23 @@ def _save_heatmap(win_rate_matrix: pd.DataFrame, count_matrix: pd.DataFrame) ->
     )
 
     data = win_rate_matrix.to_numpy(dtype=float)
-    fig, ax = plt.subplots(figsize=(14, 6))
+    # Standalone Agg figure: no pyplot state machine and no GUI backend probing.
+    fig = Figure(figsize=(14, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
     image = ax.imshow(data, cmap=cmap, vmin=0, vmax=100, aspect="auto")
 
     ax.set_xticks(np.arange(len(win_rate_matrix.columns)))
     ax.set_yticks(np.arange(len(win_rate_matrix.index)))
-    ax.set_xticklabels(win_rate_matrix.columns)
+    ax.set_xticklabels(win_rate_matrix.columns, rotation=45, ha="right", rotation_mode="anchor")
     ax.set_yticklabels(win_rate_matrix.index)
-    plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
 
-    for row_index, row_name in enumerate(win_rate_matrix.index):
-        for col_index, col_name in enumerate(win_rate_matrix.columns):
-            win_rate = win_rate_matrix.loc[row_name, col_name]
-            n_value = int(count_matrix.loc[row_name, col_name])
-            label = "insufficient\n(n<5)" if n_value < 5 or pd.isna(win_rate) else f"{win_rate:.1f}%\n(n={n_value})"
+    counts = count_matrix.to_numpy(dtype=np.int64)
+    for row_index in range(data.shape[0]):
+        for col_index in range(data.shape[1]):
+            win_rate = data[row_index, col_index]
+            n_value = counts[row_index, col_index]
+            label = "insufficient\n(n<5)" if n_value < 5 or np.isnan(win_rate) else f"{win_rate:.1f}%\n(n={n_value})"
             ax.text(col_index, row_index, label, ha="center", va="center", color="black", fontsize=9)
 
     ax.set_title("Win Rate Heatmap: Volatility Regime × Time of Day")
@@ -163,22 +196,11 @@ def _save_heatmap(win_rate_matrix: pd.DataFrame, count_matrix: pd.DataFrame) ->
 
     fig.tight_layout()
     fig.savefig(HEATMAP_PATH, dpi=200)
-    plt.close(fig)
-
-
-def _table_to_records(table: pd.DataFrame, dimension_col: str) -> list[dict]:
-    records: list[dict] = []
-    for _, row in table.iterrows():
-        records.append(
-            {
-                dimension_col: row[dimension_col],
-                "win_rate": _to_float(row["win_rate"]),
-                "avg_r_multiple": _to_float(row["avg_r_multiple"]),
-                "avg_confidence": _to_float(row["avg_confidence"]),
-                "count": int(row["count"]),
-            }
-        )
-    return records
+
+
+def _table_to_records(table: pd.DataFrame) -> list[dict]:
+    # Columns are already in output order; NaN means "no samples" and becomes null.
+    return table.astype(object).where(table.notna(), None).to_dict(orient="records")
 
 
 def _crosstab_to_json(crosstab_data: dict) -> dict:
@@ -191,12 +213,14 @@ def _crosstab_to_json(crosstab_data: dict) -> dict:
         "cells": {},
     }
 
+    rates = win_rate.to_numpy(dtype=float)
+    counts = count.to_numpy(dtype=np.int64)
     cells: dict[str, dict[str, float | int | str | None]] = {}
-    for row in win_rate.index:
-        for col in win_rate.columns:
+    for i, row in enumerate(win_rate.index):
+        for j, col in enumerate(win_rate.columns):
             key = f"{row}|{col}"
-            n_value = int(count.loc[row, col])
-            win_value = _to_float(win_rate.loc[row, col])
+            n_value = int(counts[i, j])
+            win_value = _to_float(rates[i, j])
             status = "insufficient data" if n_value < 5 or win_value is None else "ok"
             cells[key] = {
                 "row": row,
@@ -216,8 +240,10 @@ def main() -> None:
     args = parser.parse_args()
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    generated_at = datetime.now(timezone.utc).isoformat()
 
-    df = load_eval_outcomes(days=args.days, trades_only=True)
+    # Confidences back to float64 so avg_confidence serializes as stored, not with float32 noise
+    df = _widen_scores(load_eval_outcomes(days=args.days, trades_only=True))
     total_trades = len(df)
 
     if total_trades < 10:
@@ -228,7 +254,7 @@ def main() -> None:
         print(message)
         payload = {
             "metadata": {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "generated_at": generated_at,
                 "lookback_days": args.days,
                 "total_trades": total_trades,
                 "message": message,
@@ -236,27 +262,34 @@ def main() -> None:
             "single_dimension": {},
             "cross_tabulations": {},
         }
-        with open(JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump(payload, file, indent=2)
+        JSON_PATH.write_bytes(_json_dumpb(payload, indent=True))
         return
 
-    vol_table = _single_dimension_breakdown(df, "volatility_regime", VOLATILITY_ORDER)
-    tod_table = _single_dimension_breakdown(df, "time_of_day", TIME_OF_DAY_ORDER)
-    liq_table = _single_dimension_breakdown(df, "liquidity_bucket", LIQUIDITY_ORDER)
+    # Win flag computed once and shared by every breakdown and cross-tab below.
+    df["is_win"] = (df["r_multiple"].to_numpy() > 0).astype(np.int8)
+    # Canonical categories: groupbys compare int codes and come out in display order;
+    # labels outside the known vocabulary become NaN (they were dropped by reindex before).
+    for column, order in REGIME_ORDERS.items():
+        df[column] = pd.Categorical(df[column], categories=order)
+
+    vol_table = _single_dimension_breakdown(df, "volatility_regime")
+    tod_table = _single_dimension_breakdown(df, "time_of_day")
+    liq_table = _single_dimension_breakdown(df, "liquidity_bucket")
 
     _print_breakdown("Volatility Regime Breakdown", vol_table, "volatility_regime")
     _print_breakdown("Time of Day Breakdown", tod_table, "time_of_day")
     _print_breakdown("Liquidity Bucket Breakdown", liq_table, "liquidity_bucket")
 
+    cube = _regime_cube(df)
     vol_by_tod = _build_crosstab(
-        df,
+        cube,
         row_col="volatility_regime",
         col_col="time_of_day",
         row_order=VOLATILITY_ORDER,
         col_order=TIME_OF_DAY_ORDER,
     )
     vol_by_liq = _build_crosstab(
-        df,
+        cube,
         row_col="volatility_regime",
         col_col="liquidity_bucket",
         row_order=VOLATILITY_ORDER,
@@ -270,14 +303,14 @@ def main() -> None:
 
     output = {
         "metadata": {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "generated_at": generated_at,
             "lookback_days": args.days,
             "total_trades": total_trades,
         },
         "single_dimension": {
-            "volatility_regime": _table_to_records(vol_table, "volatility_regime"),
-            "time_of_day": _table_to_records(tod_table, "time_of_day"),
-            "liquidity_bucket": _table_to_records(liq_table, "liquidity_bucket"),
+            "volatility_regime": _table_to_records(vol_table),
+            "time_of_day": _table_to_records(tod_table),
+            "liquidity_bucket": _table_to_records(liq_table),
         },
         "cross_tabulations": {
             "volatility_x_time_of_day": _crosstab_to_json(vol_by_tod),
@@ -288,8 +321,7 @@ def main() -> None:
         },
     }
 
-    with open(JSON_PATH, "w", encoding="utf-8") as file:
-        json.dump(output, file, indent=2)
+    JSON_PATH.write_bytes(_json_dumpb(output, indent=True))
 
     print(f"\nSaved JSON report: {JSON_PATH}")
     print(f"Saved heatmap: {HEATMAP_PATH}")
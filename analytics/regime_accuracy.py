@@ -1,7 +1,7 @@
 """Regime-conditioned win-rate analysis.
 
 Analyzes completed outcomes by:
-- volatility regime extracted from evaluations.features_json
+- volatility regime extracted from evaluations.features_json (json_extract in SQL)
 - time of day bucket derived from evaluation timestamp in Eastern Time
 
 Outputs:
@@ -12,18 +12,17 @@ Outputs:
 
 from __future__ import annotations
 
-import json
 import sys
 from pathlib import Path
 
 # Ensure analytics/ is on sys.path for bare imports when run from project root
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np
 import pandas as pd
-import seaborn as sns
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 import db_loader
 
@@ -35,39 +34,20 @@ VOLATILITY_ORDER = ["low_vol", "normal", "high_vol"]
 TIME_OF_DAY_ORDER = ["morning", "midday", "afternoon"]
 
 
-def _parse_features(features_json: str | None) -> dict:
-    if not features_json:
-        return {}
-    try:
-        parsed = json.loads(features_json)
-    except json.JSONDecodeError:
-        return {}
-    return parsed if isinstance(parsed, dict) else {}
+# Minutes after midnight ET: [09:30, 11:00) morning, [11:00, 14:00) midday,
+# [14:00, 16:00] afternoon (16:00 inclusive, hence the 961 edge).
+TIME_OF_DAY_BINS = [9 * 60 + 30, 11 * 60, 14 * 60, 16 * 60 + 1]
 
 
-def _derive_time_of_day_et(ts: pd.Timestamp) -> str | None:
-    if pd.isna(ts):
-        return None
-
-    timestamp = pd.Timestamp(ts)
-    if timestamp.tzinfo is None:
-        timestamp = timestamp.tz_localize("UTC")
-
-    et = timestamp.tz_convert("America/New_York")
-    minutes = et.hour * 60 + et.minute
-
-    market_open = 9 * 60 + 30
-    morning_end = 11 * 60
-    midday_end = 14 * 60
-    afternoon_end = 16 * 60
-
-    if market_open <= minutes < morning_end:
-        return "morning"
-    if morning_end <= minutes < midday_end:
-        return "midday"
-    if midday_end <= minutes <= afternoon_end:
-        return "afternoon"
-    return None
+def _time_of_day_et(timestamps: pd.Series) -> pd.Series:
+    """Bucket timestamps (naive = UTC) into TIME_OF_DAY_ORDER by Eastern Time; <NA> outside hours."""
+    ts = pd.to_datetime(timestamps)
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize("UTC")
+    et = ts.dt.tz_convert("America/New_York")
+    minutes = et.dt.hour * 60 + et.dt.minute
+    buckets = pd.cut(minutes, bins=TIME_OF_DAY_BINS, labels=TIME_OF_DAY_ORDER, right=False)
+    return buckets.astype("string[pyarrow]")
 
 
 def load_regime_dataset() -> pd.DataFrame:
@@ -81,35 +61,44 @@ def load_regime_dataset() -> pd.DataFrame:
           e.id AS evaluation_id,
           e.timestamp,
           e.ensemble_trade_score AS ensemble_score,
-          e.features_json,
+          -- json_valid guard: malformed JSON reads as NULL instead of failing the query
+          CASE WHEN json_valid(e.features_json)
+            THEN json_extract(e.features_json, '$.volatility_regime') END AS volatility_regime,
+          CASE WHEN json_valid(e.features_json)
+            THEN json_extract(e.features_json, '$.relative_volume') END AS relative_volume,
           o.r_multiple,
+          -- win flag computed by SQLite while rows stream out (r_multiple is non-null here)
+          (o.r_multiple > 0) AS outcome,
           m.model_id
         FROM evaluations e
         JOIN outcomes o ON o.evaluation_id = e.id
-        JOIN model_outputs m ON m.evaluation_id = e.id
+        -- model_outputs is one-to-many: collapse to one row per evaluation before the join
+        JOIN (
+          SELECT evaluation_id, MIN(model_id) AS model_id
+          FROM model_outputs
+          GROUP BY evaluation_id
+        ) m ON m.evaluation_id = e.id
         WHERE o.trade_taken = 1
           AND o.r_multiple IS NOT NULL
         ORDER BY e.timestamp DESC
         """,
         conn,
         parse_dates=["timestamp"],
+        # Arrow-backed strings for the label columns: no per-value Python str objects
+        dtype={
+            "outcome": "int8",
+            "volatility_regime": "string[pyarrow]",
+            "model_id": "string[pyarrow]",
+        },
     )
     conn.close()
 
     if df.empty:
         return df
 
-    # model_outputs is one-to-many, dedupe to one row/evaluation
-    df = df.drop_duplicates(subset=["evaluation_id"])
+    df["relative_volume"] = pd.to_numeric(df["relative_volume"], errors="coerce")
 
-    parsed = df["features_json"].apply(_parse_features)
-    df["volatility_regime"] = parsed.apply(lambda x: x.get("volatility_regime"))
-    df["relative_volume"] = pd.to_numeric(
-        parsed.apply(lambda x: x.get("relative_volume")), errors="coerce"
-    )
-
-    df["time_of_day"] = df["timestamp"].apply(_derive_time_of_day_et)
-    df["outcome"] = (df["r_multiple"] > 0).astype(int)
+    df["time_of_day"] = _time_of_day_et(df["timestamp"])
 
     return df
 
@@ -118,19 +107,20 @@ def summarize(df: pd.DataFrame) -> pd.DataFrame:
     filtered = df[
         df["volatility_regime"].isin(VOLATILITY_ORDER)
         & df["time_of_day"].isin(TIME_OF_DAY_ORDER)
-    ].copy()
+    ]
 
     grouped = (
         filtered.groupby(["volatility_regime", "time_of_day"], as_index=False)
         .agg(
             samples=("outcome", "count"),
             wins=("outcome", "sum"),
-            win_rate=("outcome", "mean"),
             avg_ensemble_score=("ensemble_score", "mean"),
             avg_relative_volume=("relative_volume", "mean"),
         )
     )
-    grouped["win_rate"] = grouped["win_rate"] * 100.0
+    # Win rate from the counts already aggregated, as one vector op (no extra group pass).
+    win_rate = grouped["wins"] / grouped["samples"] * 100.0
+    grouped.insert(grouped.columns.get_loc("wins") + 1, "win_rate", win_rate)
     return grouped
 
 
@@ -139,11 +129,13 @@ def print_tables(summary_df: pd.DataFrame) -> None:
         print("No completed trade outcomes available for regime accuracy analysis.")
         return
 
+    # Cell text formatted column-at-a-time with np.char.mod (no per-value lambdas).
     display = summary_df.copy()
-    display["win_rate"] = display["win_rate"].map(lambda v: f"{v:.1f}%")
-    display["avg_ensemble_score"] = display["avg_ensemble_score"].map(lambda v: f"{v:.2f}")
-    display["avg_relative_volume"] = display["avg_relative_volume"].map(
-        lambda v: "-" if pd.isna(v) else f"{v:.2f}"
+    display["win_rate"] = np.char.mod("%.1f%%", summary_df["win_rate"].to_numpy(dtype=float))
+    display["avg_ensemble_score"] = np.char.mod("%.2f", summary_df["avg_ensemble_score"].to_numpy(dtype=float))
+    relative_volume = summary_df["avg_relative_volume"].to_numpy(dtype=float)
+    display["avg_relative_volume"] = np.where(
+        np.isnan(relative_volume), "-", np.char.mod("%.2f", relative_volume)
     )
 
     print("\nRegime × Time-of-Day Win Rate Summary")
@@ -184,33 +176,43 @@ def save_heatmap(summary_df: pd.DataFrame) -> None:
         index="volatility_regime", columns="time_of_day", values="samples"
     ).reindex(index=VOLATILITY_ORDER, columns=TIME_OF_DAY_ORDER)
 
-    annotations = heatmap_data.copy()
-    for row in heatmap_data.index:
-        for col in heatmap_data.columns:
-            rate = heatmap_data.loc[row, col]
-            n = count_data.loc[row, col]
-            if pd.isna(rate):
-                annotations.loc[row, col] = "n=0"
-            else:
-                annotations.loc[row, col] = f"{rate:.1f}%\nn={int(n)}"
-
-    plt.figure(figsize=(8, 5))
-    sns.heatmap(
-        heatmap_data,
-        annot=annotations,
-        fmt="",
-        cmap="RdYlGn",
-        vmin=0,
-        vmax=100,
-        linewidths=0.5,
-        cbar_kws={"label": "Win Rate (%)"},
-    )
-    plt.title("Win Rate by Volatility Regime × Time of Day")
-    plt.xlabel("Time of Day (ET)")
-    plt.ylabel("Volatility Regime")
-    plt.tight_layout()
-    plt.savefig(HEATMAP_PATH, dpi=160)
-    plt.close()
+    # Labels built on the raw arrays in one go (no per-cell .loc reads/writes).
+    rates = heatmap_data.to_numpy(dtype=float)
+    counts = count_data.to_numpy(dtype=float)
+    labels = np.array(
+        ["n=0" if np.isnan(rate) else f"{rate:.1f}%\nn={int(n)}" for rate, n in zip(rates.ravel(), counts.ravel())],
+        dtype=object,
+    ).reshape(rates.shape)
+
+    # Plain imshow grid on a standalone Agg figure (same approach as regime.py).
+    cmap = colormaps["RdYlGn"]
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    image = ax.imshow(np.ma.masked_invalid(rates), cmap=cmap, vmin=0, vmax=100, aspect="auto")
+
+    ax.set_xticks(np.arange(len(TIME_OF_DAY_ORDER)))
+    ax.set_yticks(np.arange(len(VOLATILITY_ORDER)))
+    ax.set_xticklabels(TIME_OF_DAY_ORDER)
+    ax.set_yticklabels(VOLATILITY_ORDER)
+
+    # Dark text on light cells, white on the saturated ends of the colormap.
+    rgb = cmap(np.nan_to_num(rates, nan=50.0) / 100.0)[..., :3]
+    luminance = rgb @ np.array([0.2126, 0.7152, 0.0722])
+    for row_index in range(rates.shape[0]):
+        for col_index in range(rates.shape[1]):
+            color = "black" if luminance[row_index, col_index] > 0.408 else "white"
+            ax.text(col_index, row_index, labels[row_index, col_index], ha="center", va="center", color=color)
+
+    ax.set_title("Win Rate by Volatility Regime × Time of Day")
+    ax.set_xlabel("Time of Day (ET)")
+    ax.set_ylabel("Volatility Regime")
+
+    cbar = fig.colorbar(image, ax=ax)
+    cbar.set_label("Win Rate (%)")
+
+    fig.tight_layout()
+    fig.savefig(HEATMAP_PATH, dpi=160)
 
 
 def main() -> None:
@@ -221,17 +223,23 @@ def main() -> None:
         print("No data found. Nothing to export.")
         return
 
-    total_outcomes = int(df["outcome"].count())
+    total_outcomes = len(df)  # outcome is never NULL (r_multiple IS NOT NULL in the query)
     if total_outcomes < 50:
         print(f"WARNING: only {total_outcomes} outcomes found (<50). Results may be noisy.")
 
     summary_df = summarize(df)
     print_tables(summary_df)
 
+    # Header-only CSV still written so a stale file from an earlier run is not left behind.
     summary_df.to_csv(CSV_PATH, index=False)
-    save_heatmap(summary_df)
-
     print(f"\nSaved CSV: {CSV_PATH}")
+    if summary_df.empty:
+        # No heatmap to draw; drop any left over from an earlier run so it can't pass for this one.
+        HEATMAP_PATH.unlink(missing_ok=True)
+        print("No regime data; heatmap not written.")
+        return
+
+    save_heatmap(summary_df)
     print(f"Saved heatmap: {HEATMAP_PATH}")
 
 
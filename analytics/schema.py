@@ -4,9 +4,11 @@ Do not edit manually. Run 'npm run generate:schema' to update.
 """
 
 from typing import Optional, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class Order(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: int
     order_id: int
     symbol: str
@@ -32,6 +34,8 @@ class Order(BaseModel):
     updated_at: str
 
 class Execution(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: int
     exec_id: str
     order_id: int
@@ -48,6 +52,8 @@ class Execution(BaseModel):
     created_at: str
 
 class Evaluation(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: str
     symbol: str
     direction: Optional[str]
@@ -90,6 +96,8 @@ class Evaluation(BaseModel):
     total_latency_ms: Optional[int]
 
 class ModelOutput(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: int
     evaluation_id: str
     model_id: str
@@ -113,6 +121,8 @@ class ModelOutput(BaseModel):
     timestamp: str
 
 class Outcome(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: int
     evaluation_id: str
     trade_taken: int
@@ -128,10 +138,11 @@ class Outcome(BaseModel):
     recorded_at: str
 
 class WeightHistory(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
     id: int
     weights_json: str
     sample_size: Optional[int]
     reason: Optional[str]
     created_at: str
 
-
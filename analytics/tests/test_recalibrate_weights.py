@@ -0,0 +1,35 @@
+"""Tests for recalibrate_weights.compute_model_metrics."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from recalibrate_weights import compute_model_metrics  # noqa: E402
+
+
+class ComputeModelMetricsTest(unittest.TestCase):
+    def test_all_non_compliant_model_gets_zero_metrics(self):
+        df = pd.DataFrame({
+            "model_id": ["claude", "claude", "gpt4o", "gpt4o"],
+            "compliant": [1, 1, 0, 0],
+            "r_multiple": [1.5, -1.0, 2.0, -0.5],
+            "trade_score": [70.0, 40.0, 80.0, 30.0],
+            "confidence": [80.0, 30.0, 90.0, 20.0],
+            "should_trade": [1, 1, 1, 1],
+        })
+
+        metrics = compute_model_metrics(df)
+
+        self.assertEqual(metrics["gpt4o"], metrics["gemini"])
+        self.assertEqual(metrics["gpt4o"]["compliant_count"], 0)
+        self.assertEqual(metrics["gpt4o"]["brier"], 1.0)
+        self.assertEqual(metrics["gpt4o"]["model_score"], 0.0)
+        self.assertEqual(metrics["claude"]["compliant_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,45 +10,106 @@ Usage:
 """
 
 import argparse
-import json
 import sqlite3
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+# Ensure analytics/ is on sys.path for bare imports when run from project root
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from db_loader import READ_PRAGMAS, _arrow_frame, _json_dumpb, _parquet_cached, adbc_sqlite  # noqa: E402
+
 ANALYTICS_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = ANALYTICS_DIR.parent
 DB_PATH = PROJECT_ROOT / "data" / "bridge.db"
 OUTPUT_DIR = ANALYTICS_DIR / "output"
 
+# Columns the analytics below read (the table has ~40; notes/tags/prices are never used)
+TRADE_COLUMNS = (
+    "symbol", "status", "side", "open_date", "open_time", "return_dollars", "net_return",
+    "commission", "return_pct", "r_multiple", "mae", "mfe", "holdtime", "signal_source",
+)
+
 
 def load_trades(days: int | None = None) -> pd.DataFrame:
-    """Load all TraderSync trades from DB."""
-    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    """
+    Load all TraderSync trades from DB, with open_hour and hold_minutes derived.
+
+    The parsed frame is memoized as Parquet under analytics/.cache, keyed on the
+    window (plus today's UTC date, since the window is relative to date('now'))
+    and invalidated whenever bridge.db or its WAL changes, so re-runs skip the
+    SQLite scan and the parsing.
+    """
+    key = (str(DB_PATH), days, datetime.now(timezone.utc).date().isoformat() if days else None)
+    return _parquet_cached("tradersync_trades", key, lambda: _query_trades(days), db_path=DB_PATH)
+
+
+@lru_cache(maxsize=1)
+def _read_conn(db_path: Path):
+    """
+    Long-lived read-only connection to bridge.db (ADBC when installed, else sqlite3).
+
+    db_loader's READ_PRAGMAS are applied once at open. Autocommit keeps each read on a
+    fresh snapshot, so rows the bridge writes through WAL stay visible; the file is not
+    opened immutable for the same reason.
+    """
+    if adbc_sqlite is not None:
+        conn = adbc_sqlite.connect(f"file:{db_path}?mode=ro", autocommit=True)
+        with conn.cursor() as cur:
+            for pragma in READ_PRAGMAS:
+                cur.execute(pragma)
+        return conn
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, isolation_level=None, check_same_thread=False)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _query_trades(days: int | None) -> pd.DataFrame:
     where = ""
     params: list = []
     if days:
         where = f"WHERE open_date >= date('now', ? || ' days')"
         params = [f"-{days}"]
-    df = pd.read_sql_query(
-        f"SELECT * FROM tradersync_trades {where} ORDER BY open_date DESC, open_time DESC",
-        conn,
-        params=params,
-    )
-    conn.close()
+    # open_hour is cut out of 'HH:MM[:SS]' by SQLite, so no pandas string split is needed
+    sql = f"""
+        SELECT {", ".join(TRADE_COLUMNS)},
+          CASE WHEN instr(open_time, ':') > 1
+            THEN CAST(substr(open_time, 1, instr(open_time, ':') - 1) AS INTEGER) END AS open_hour
+        FROM tradersync_trades {where}
+        ORDER BY open_date DESC, open_time DESC
+    """
+
+    conn = _read_conn(DB_PATH)
+    if adbc_sqlite is not None:
+        # Arrow-native read: columns land in Arrow buffers instead of per-row Python tuples
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            df = _arrow_frame(cur.fetch_arrow_table().to_pandas())
+    else:
+        df = pd.read_sql_query(sql, conn, params=params)
 
     # Parse dates
     df["open_date"] = pd.to_datetime(df["open_date"])
-    df["close_date"] = pd.to_datetime(df["close_date"])
-    # Extract hour from open_time
-    df["open_hour"] = df["open_time"].str.split(":").str[0].astype(int, errors="ignore")
+    df["hold_minutes"] = _hold_minutes(df["holdtime"])
+    # Low-cardinality labels as categoricals: equality tests and factorize work on int codes.
+    # Untagged trades count as manual signals.
+    df["signal_source"] = df["signal_source"].fillna("manual")
+    for col in ("status", "side", "signal_source", "symbol"):
+        df[col] = df[col].astype("category")
+    # Win flag derived once; every breakdown sums it
+    df["is_win"] = (df["status"] == "WIN").to_numpy(dtype=np.int32)
     return df
 
 
 def overview(df: pd.DataFrame) -> dict:
     """Top-level stats."""
-    wins = (df["status"] == "WIN").sum()
+    wins = df["is_win"].sum()
     losses = (df["status"] == "LOSS").sum()
     total = len(df)
     return {
@@ -78,11 +139,13 @@ def r_multiple_analysis(df: pd.DataFrame) -> dict:
     wins = r_with[r_with["status"] == "WIN"]["r_multiple"]
     losses = r_with[r_with["status"] == "LOSS"]["r_multiple"]
 
-    # Histogram buckets
-    bins = [-np.inf, -1.0, -0.5, -0.25, 0, 0.1, 0.25, 0.5, 1.0, np.inf]
+    # Histogram buckets, right-closed like pd.cut: bucket k holds edges[k-1] < r <= edges[k]
+    edges = np.array([-1.0, -0.5, -0.25, 0, 0.1, 0.25, 0.5, 1.0])
     labels = ["<-1R", "-1 to -0.5R", "-0.5 to -0.25R", "-0.25 to 0R",
               "0 to 0.1R", "0.1 to 0.25R", "0.25 to 0.5R", "0.5 to 1R", ">1R"]
-    hist = pd.cut(r, bins=bins, labels=labels).value_counts().sort_index()
+    values = r.to_numpy(dtype=float)
+    values = values[values > -np.inf]  # the open (-inf, -1] bucket excludes -inf itself
+    hist = np.bincount(np.searchsorted(edges, values, side="left"), minlength=len(labels))
 
     return {
         "has_r_data": True,
@@ -95,123 +158,163 @@ def r_multiple_analysis(df: pd.DataFrame) -> dict:
         "best_r": round(float(r.max()), 4),
         "worst_r": round(float(r.min()), 4),
         "std_r": round(float(r.std()), 4),
-        "distribution": {k: int(v) for k, v in hist.items()},
+        "distribution": dict(zip(labels, hist.tolist())),
+    }
+
+
+def _trade_arrays(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Per-trade columns every breakdown aggregates, extracted once per report as flat float arrays.
+
+    NaNs are stored as 0 next to a 0/1 "<key>_valid" array, so a group's NaN-skipping sum and
+    non-NaN count (pandas sum/count semantics) are both plain weighted bincounts.
+    """
+    arrays = {"is_win": df["is_win"].to_numpy(dtype=float)}
+    for key, col in (("pnl", "return_dollars"), ("net", "net_return"), ("r", "r_multiple")):
+        values = df[col].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        arrays[key] = np.where(valid, values, 0.0)
+        arrays[f"{key}_valid"] = valid.astype(float)
+    return arrays
+
+
+def _group_stats(arrays: dict[str, np.ndarray], codes: np.ndarray, n_groups: int) -> dict[str, np.ndarray]:
+    """
+    Trades, wins, P&L/net sums, mean P&L and mean R per group code from _trade_arrays.
+
+    codes are factorized group keys (-1 = missing key, dropped like groupby does).
+    """
+    keep = codes >= 0
+    if not keep.all():
+        codes = codes[keep]
+        arrays = {key: values[keep] for key, values in arrays.items()}
+
+    def total(key: str) -> np.ndarray:
+        return np.bincount(codes, weights=arrays[key], minlength=n_groups)
+
+    pnl = total("pnl")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_pnl = pnl / total("pnl_valid")
+        avg_r = total("r") / total("r_valid")
+    return {
+        "trades": np.bincount(codes, minlength=n_groups),
+        "wins": total("is_win").astype(np.int64),
+        "pnl": pnl,
+        "avg_pnl": avg_pnl,
+        "net": total("net"),
+        "avg_r": avg_r,
     }
 
 
-def side_breakdown(df: pd.DataFrame) -> dict:
+def _r_or_none(value: float) -> float | None:
+    return round(float(value), 4) if not np.isnan(value) else None
+
+
+def side_breakdown(df: pd.DataFrame, arrays: dict[str, np.ndarray]) -> dict:
     """Performance by LONG vs SHORT."""
+    sides = ["LONG", "SHORT"]
+    stats = _group_stats(arrays, pd.Categorical(df["side"], categories=sides).codes, len(sides))
     result = {}
-    for side in ["LONG", "SHORT"]:
-        sub = df[df["side"] == side]
-        if sub.empty:
+    for i, side in enumerate(sides):
+        total = int(stats["trades"][i])
+        if not total:
             continue
-        wins = (sub["status"] == "WIN").sum()
         result[side] = {
-            "total": int(len(sub)),
-            "wins": int(wins),
-            "win_rate": round(wins / len(sub), 4),
-            "avg_pnl": round(float(sub["return_dollars"].mean()), 2),
-            "total_pnl": round(float(sub["return_dollars"].sum()), 2),
-            "avg_r": round(float(sub["r_multiple"].dropna().mean()), 4) if sub["r_multiple"].notna().any() else None,
+            "total": total,
+            "wins": int(stats["wins"][i]),
+            "win_rate": round(float(stats["wins"][i] / total), 4),
+            "avg_pnl": round(float(stats["avg_pnl"][i]), 2),
+            "total_pnl": round(float(stats["pnl"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
     return result
 
 
-def time_of_day_analysis(df: pd.DataFrame) -> dict:
+def time_of_day_analysis(df: pd.DataFrame, arrays: dict[str, np.ndarray]) -> dict:
     """Performance by hour of day."""
+    # The hour is its own group code (bincount slot), so no factorize/sort is needed;
+    # missing or unparseable hours get -1 and are dropped.
+    hour = df["open_hour"].to_numpy(dtype=float)
+    codes = np.where(hour >= 0, np.nan_to_num(hour, nan=-1), -1).astype(np.intp)
+    n_hours = max(24, int(codes.max(initial=-1)) + 1)
+    stats = _group_stats(arrays, codes, n_hours)
     result = {}
-    for hour in sorted(df["open_hour"].dropna().unique()):
-        sub = df[df["open_hour"] == hour]
-        if len(sub) < 3:
-            continue
-        wins = (sub["status"] == "WIN").sum()
-        result[f"{int(hour):02d}:00"] = {
-            "trades": int(len(sub)),
-            "win_rate": round(wins / len(sub), 4),
-            "avg_pnl": round(float(sub["return_dollars"].mean()), 2),
-            "avg_r": round(float(sub["r_multiple"].dropna().mean()), 4) if sub["r_multiple"].notna().any() else None,
+    for i in np.flatnonzero(stats["trades"] >= 3):
+        trades = int(stats["trades"][i])
+        result[f"{i:02d}:00"] = {
+            "trades": trades,
+            "win_rate": round(float(stats["wins"][i] / trades), 4),
+            "avg_pnl": round(float(stats["avg_pnl"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
     return result
 
 
-def daily_performance(df: pd.DataFrame) -> list[dict]:
+def daily_performance(df: pd.DataFrame, arrays: dict[str, np.ndarray]) -> list[dict]:
     """Per-day aggregates (last 30 trading days)."""
-    daily = df.groupby(df["open_date"].dt.date).agg(
-        trades=("status", "count"),
-        wins=("status", lambda x: (x == "WIN").sum()),
-        pnl=("return_dollars", "sum"),
-        net=("net_return", "sum"),
-        avg_r=("r_multiple", "mean"),
-    ).reset_index()
-    daily.columns = ["date", "trades", "wins", "pnl", "net", "avg_r"]
-    daily["win_rate"] = daily["wins"] / daily["trades"]
-    daily = daily.sort_values("date", ascending=False).head(30)
+    codes, days = pd.factorize(df["open_date"].dt.normalize(), sort=True)
+    stats = _group_stats(arrays, codes, len(days))
+    # ISO day strings in one vectorized cast rather than a strftime per row
+    dates_iso = days.to_numpy().astype("datetime64[D]").astype(str).tolist()
 
     return [
         {
-            "date": str(row["date"]),
-            "trades": int(row["trades"]),
-            "wins": int(row["wins"]),
-            "win_rate": round(float(row["win_rate"]), 4),
-            "pnl": round(float(row["pnl"]), 2),
-            "net": round(float(row["net"]), 2),
-            "avg_r": round(float(row["avg_r"]), 4) if pd.notna(row["avg_r"]) else None,
+            "date": dates_iso[i],
+            "trades": int(stats["trades"][i]),
+            "wins": int(stats["wins"][i]),
+            "win_rate": round(float(stats["wins"][i] / stats["trades"][i]), 4),
+            "pnl": round(float(stats["pnl"][i]), 2),
+            "net": round(float(stats["net"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
-        for _, row in daily.iterrows()
+        for i in range(len(days) - 1, max(len(days) - 30, 0) - 1, -1)
     ]
 
 
-def top_symbols(df: pd.DataFrame, n: int = 20) -> list[dict]:
+def top_symbols(df: pd.DataFrame, arrays: dict[str, np.ndarray], n: int = 20) -> list[dict]:
     """Most-traded symbols by frequency."""
-    sym = df.groupby("symbol").agg(
-        trades=("status", "count"),
-        wins=("status", lambda x: (x == "WIN").sum()),
-        pnl=("return_dollars", "sum"),
-        avg_r=("r_multiple", "mean"),
-    ).reset_index()
-    sym["win_rate"] = sym["wins"] / sym["trades"]
-    sym = sym.sort_values("trades", ascending=False).head(n)
+    # symbol is categorical (load_trades): its codes index the sorted categories directly
+    symbol = df["symbol"].cat
+    symbols = symbol.categories
+    stats = _group_stats(arrays, symbol.codes.to_numpy(), len(symbols))
+    trades = stats["trades"]
+    # Only symbols reaching the n-th highest count can make the cut; partition finds that
+    # count, then a stable sort of just those candidates keeps equal counts alphabetical.
+    floor = np.partition(trades, len(trades) - n)[len(trades) - n] if len(trades) > n else 0
+    candidates = np.flatnonzero(trades >= max(floor, 1))
+    order = candidates[np.argsort(-trades[candidates], kind="stable")][:n]
 
     return [
         {
-            "symbol": row["symbol"],
-            "trades": int(row["trades"]),
-            "wins": int(row["wins"]),
-            "win_rate": round(float(row["win_rate"]), 4),
-            "pnl": round(float(row["pnl"]), 2),
-            "avg_r": round(float(row["avg_r"]), 4) if pd.notna(row["avg_r"]) else None,
+            "symbol": symbols[i],
+            "trades": int(stats["trades"][i]),
+            "wins": int(stats["wins"][i]),
+            "win_rate": round(float(stats["wins"][i] / stats["trades"][i]), 4),
+            "pnl": round(float(stats["pnl"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
-        for _, row in sym.iterrows()
+        for i in order
     ]
 
 
 def streak_analysis(df: pd.DataFrame) -> dict:
     """Win/loss streak analysis."""
     sorted_df = df.sort_values(["open_date", "open_time"])
-    statuses = sorted_df["status"].tolist()
-
-    max_win_streak = 0
-    max_loss_streak = 0
-    current_streak = 0
-    current_type = None
-
-    for s in statuses:
-        if s == current_type:
-            current_streak += 1
-        else:
-            current_type = s
-            current_streak = 1
-        if s == "WIN":
-            max_win_streak = max(max_win_streak, current_streak)
-        elif s == "LOSS":
-            max_loss_streak = max(max_loss_streak, current_streak)
+    statuses = sorted_df["status"]
+    if not len(statuses):
+        return {"max_win_streak": 0, "max_loss_streak": 0, "current_streak": 0, "current_type": None}
+
+    # Run-length encode the status sequence: runs start wherever the status changes
+    codes, _ = pd.factorize(statuses)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(codes)])
+    run_status = statuses.iloc[starts].to_numpy()
 
     return {
-        "max_win_streak": max_win_streak,
-        "max_loss_streak": max_loss_streak,
-        "current_streak": current_streak,
-        "current_type": current_type,
+        "max_win_streak": int(lengths[run_status == "WIN"].max(initial=0)),
+        "max_loss_streak": int(lengths[run_status == "LOSS"].max(initial=0)),
+        "current_streak": int(lengths[-1]),
+        "current_type": run_status[-1],
     }
 
 
@@ -237,70 +340,83 @@ def mae_mfe_analysis(df: pd.DataFrame) -> dict:
     }
 
 
-def holdtime_analysis(df: pd.DataFrame) -> dict:
-    """Performance by hold time buckets."""
-    def parse_holdtime_minutes(ht: str) -> float | None:
-        if not isinstance(ht, str):
-            return None
-        ht = ht.strip()
-        if "sec" in ht:
-            parts = ht.split()
-            return float(parts[0]) / 60
-        if "min" in ht:
-            parts = ht.replace(" min", "").split(":")
-            return float(parts[0]) + (float(parts[1]) / 60 if len(parts) > 1 else 0)
-        if "hr" in ht:
-            parts = ht.replace(" hr", "").split(":")
-            h = float(parts[0])
-            m = float(parts[1]) if len(parts) > 1 else 0
-            s = float(parts[2]) if len(parts) > 2 else 0
-            return h * 60 + m + s / 60
-        if "d" in ht:
-            return float(ht.replace("d", "").strip()) * 24 * 60
+def _parse_holdtime_minutes(ht: str) -> float | None:
+    """One TraderSync holdtime string as minutes; None when absent or in an unknown format."""
+    if not isinstance(ht, str):
         return None
-
-    df = df.copy()
-    df["hold_minutes"] = df["holdtime"].apply(parse_holdtime_minutes)
-    with_ht = df[df["hold_minutes"].notna()]
-    if with_ht.empty:
+    ht = ht.strip()
+    if "sec" in ht:
+        parts = ht.split()
+        return float(parts[0]) / 60
+    if "min" in ht:
+        parts = ht.replace(" min", "").split(":")
+        return float(parts[0]) + (float(parts[1]) / 60 if len(parts) > 1 else 0)
+    if "hr" in ht:
+        parts = ht.replace(" hr", "").split(":")
+        h = float(parts[0])
+        m = float(parts[1]) if len(parts) > 1 else 0
+        s = float(parts[2]) if len(parts) > 2 else 0
+        return h * 60 + m + s / 60
+    if "d" in ht:
+        return float(ht.replace("d", "").strip()) * 24 * 60
+    return None
+
+
+def _hold_minutes(holdtime: pd.Series) -> np.ndarray:
+    """
+    TraderSync holdtime strings ('30 sec', '5:30 min', '1:05:00 hr', '2 d') as float minutes.
+
+    Each distinct string is parsed once and broadcast back through its factorize code:
+    hold times repeat heavily, so this is a handful of Python calls instead of one per trade.
+    """
+    codes, uniques = pd.factorize(holdtime)
+    parsed = np.array([_parse_holdtime_minutes(ht) for ht in uniques], dtype=float)
+    return np.where(codes >= 0, parsed[codes] if len(parsed) else np.nan, np.nan)
+
+
+def holdtime_analysis(df: pd.DataFrame, arrays: dict[str, np.ndarray]) -> dict:
+    """Performance by hold time buckets."""
+    minutes = df["hold_minutes"].to_numpy(dtype=float)
+    if np.isnan(minutes).all():
         return {"has_data": False}
 
-    bins = [0, 5, 15, 30, 60, 120, np.inf]
+    # Right-closed buckets (0, 5], (5, 15], ... (120, inf]; zero, negative and NaN minutes get -1
+    edges = np.array([5, 15, 30, 60, 120])
     labels = ["<5m", "5-15m", "15-30m", "30m-1h", "1-2h", ">2h"]
-    with_ht = with_ht.copy()
-    with_ht["ht_bucket"] = pd.cut(with_ht["hold_minutes"], bins=bins, labels=labels)
+    codes = np.where(minutes > 0, np.searchsorted(edges, minutes, side="left"), -1)
+    stats = _group_stats(arrays, codes, len(labels))
 
     result = {}
-    for bucket in labels:
-        sub = with_ht[with_ht["ht_bucket"] == bucket]
-        if sub.empty:
+    for i, bucket in enumerate(labels):
+        trades = int(stats["trades"][i])
+        if not trades:
             continue
-        wins = (sub["status"] == "WIN").sum()
         result[bucket] = {
-            "trades": int(len(sub)),
-            "win_rate": round(wins / len(sub), 4),
-            "avg_pnl": round(float(sub["return_dollars"].mean()), 2),
-            "avg_r": round(float(sub["r_multiple"].dropna().mean()), 4) if sub["r_multiple"].notna().any() else None,
+            "trades": trades,
+            "win_rate": round(float(stats["wins"][i] / trades), 4),
+            "avg_pnl": round(float(stats["avg_pnl"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
     return {"has_data": True, "buckets": result}
 
 
-def signal_source_breakdown(df: pd.DataFrame) -> dict:
+def signal_source_breakdown(df: pd.DataFrame, arrays: dict[str, np.ndarray]) -> dict:
     """Performance by signal source (holly, manual, etc)."""
+    # factorize keeps first-appearance order, same as iterating .unique()
+    codes, sources = pd.factorize(df["signal_source"])
+    stats = _group_stats(arrays, codes, len(sources))
+
     result = {}
-    for source in df["signal_source"].fillna("manual").unique():
-        sub = df[df["signal_source"].fillna("manual") == source]
-        if sub.empty:
-            continue
-        wins = (sub["status"] == "WIN").sum()
+    for i, source in enumerate(sources):
+        total = int(stats["trades"][i])
         result[source] = {
-            "total": int(len(sub)),
-            "wins": int(wins),
-            "win_rate": round(wins / len(sub), 4),
-            "avg_pnl": round(float(sub["return_dollars"].mean()), 2),
-            "total_pnl": round(float(sub["return_dollars"].sum()), 2),
-            "total_net": round(float(sub["net_return"].sum()), 2),
-            "avg_r": round(float(sub["r_multiple"].dropna().mean()), 4) if sub["r_multiple"].notna().any() else None,
+            "total": total,
+            "wins": int(stats["wins"][i]),
+            "win_rate": round(float(stats["wins"][i] / total), 4),
+            "avg_pnl": round(float(stats["avg_pnl"][i]), 2),
+            "total_pnl": round(float(stats["pnl"][i]), 2),
+            "total_net": round(float(stats["net"][i]), 2),
+            "avg_r": _r_or_none(stats["avg_r"][i]),
         }
     return result
 
@@ -311,17 +427,18 @@ def run_analytics(days: int | None = None) -> dict:
     if df.empty:
         return {"error": "No trades found"}
 
+    arrays = _trade_arrays(df)
     return {
         "overview": overview(df),
         "r_multiple": r_multiple_analysis(df),
-        "by_side": side_breakdown(df),
-        "by_signal": signal_source_breakdown(df),
-        "by_time": time_of_day_analysis(df),
-        "by_holdtime": holdtime_analysis(df),
+        "by_side": side_breakdown(df, arrays),
+        "by_signal": signal_source_breakdown(df, arrays),
+        "by_time": time_of_day_analysis(df, arrays),
+        "by_holdtime": holdtime_analysis(df, arrays),
         "mae_mfe": mae_mfe_analysis(df),
         "streaks": streak_analysis(df),
-        "top_symbols": top_symbols(df),
-        "daily_performance": daily_performance(df),
+        "top_symbols": top_symbols(df, arrays),
+        "daily_performance": daily_performance(df, arrays),
     }
 
 
@@ -380,6 +497,6 @@ if __name__ == "__main__":
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         output_path = str(OUTPUT_DIR / "ts_analytics.json")
 
-    with open(output_path, "w") as f:
-        json.dump(report, f, indent=2, default=str)
+    # orjson writes the NumPy scalars in the report directly
+    Path(output_path).write_bytes(_json_dumpb(report, indent=True))
     print(f"\nFull report saved to: {output_path}")
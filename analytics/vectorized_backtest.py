@@ -36,6 +36,34 @@ OUTPUT_DIR = Path(__file__).parent / "output"
 
 # ── Signal-Based Backtester ───────────────────────────────────────────────
 
+def _signal_returns(
+    close: np.ndarray, sig: np.ndarray, commission: float, slippage_pct: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-bar net log return, signal-change count and growth of 1."""
+    n = len(close)
+
+    # Strategy log return per bar: sig[t-1] * log(close[t] / close[t-1]) (trade at close t,
+    # return at t+1); bar 0 has none. Built in one buffer with out= ops, no temporaries.
+    net_ret = np.full(n, np.nan)
+    np.divide(close[1:], close[:-1], out=net_ret[1:])
+    np.log(net_ret[1:], out=net_ret[1:])
+    np.multiply(sig[:-1], net_ret[1:], out=net_ret[1:])
+
+    # Transaction costs on signal changes, also accumulated in place
+    trades = np.zeros(n)
+    np.abs(np.diff(sig), out=trades[1:])
+    trades[np.isnan(trades)] = 0.0
+    cost = np.divide(commission, close)
+    cost += slippage_pct
+    cost *= trades
+    net_ret -= cost
+
+    # Growth of 1 (NaN bars contribute nothing but stay NaN, as Series.cumsum does)
+    growth = np.exp(np.nancumsum(net_ret))
+    growth[np.isnan(net_ret)] = np.nan
+    return net_ret, trades, growth
+
+
 class SignalBacktester:
     """Bar-level signal backtest using log-return vectorization."""
 
@@ -57,54 +85,53 @@ class SignalBacktester:
             df: OHLCV DataFrame
             signals: Series of {-1, 0, 1}. Signal at t -> position at t+1.
         """
-        data = df.copy()
-        data["signal"] = signals
-
-        # Log returns shifted by 1 (trade at close t, return at t+1)
-        data["log_ret"] = np.log(data["close"] / data["close"].shift(1))
-        data["strat_ret"] = data["signal"].shift(1) * data["log_ret"]
+        close = df["close"].to_numpy(dtype=np.float64)
+        if not signals.index.equals(df.index):
+            signals = signals.reindex(df.index)
+        sig = signals.to_numpy(dtype=np.float64)
 
-        # Transaction costs on signal changes
-        data["trades"] = data["signal"].diff().abs().fillna(0)
-        cost_pct = (self.commission / data["close"]) + self.slippage_pct
-        data["cost"] = data["trades"] * cost_pct
-        data["net_ret"] = data["strat_ret"] - data["cost"]
+        net_ret, trades, growth = _signal_returns(close, sig, self.commission, self.slippage_pct)
+        equity = self.initial_capital * growth
 
-        # Equity curve
-        data["equity"] = self.initial_capital * np.exp(data["net_ret"].cumsum())
-
-        return self._compute_metrics(data)
+        return self._compute_metrics(df.index, net_ret, trades, equity)
 
-    def _compute_metrics(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _compute_metrics(
+        self,
+        index: pd.Index,
+        net_ret: np.ndarray,
+        trades: np.ndarray,
+        equity: np.ndarray,
+    ) -> Dict[str, Any]:
         """Compute standard performance metrics."""
-        ret = data["net_ret"].dropna()
+        ret = net_ret[~np.isnan(net_ret)]
         if len(ret) == 0:
             return {"error": "No returns"}
 
-        # Auto-detect annualization
-        if isinstance(data.index, pd.DatetimeIndex):
-            diffs = data.index.to_series().diff().dropna()
-            med = diffs.median()
-            if med < pd.Timedelta(minutes=5):
-                ann = 252 * 390
-            elif med < pd.Timedelta(hours=1):
-                ann = 252 * 13
-            else:
-                ann = 252
-        else:
-            ann = 252
-
-        total_ret = (data["equity"].iloc[-1] / self.initial_capital) - 1
+        # Auto-detect annualization from the median bar spacing (ns; steps touching NaT skipped)
+        ann = 252
+        if isinstance(index, pd.DatetimeIndex):
+            stamps = index.as_unit("ns").asi8
+            nat = index.isna()
+            steps = np.diff(stamps)[~(nat[1:] | nat[:-1])]
+            if len(steps):
+                med_ns = np.median(steps)
+                if med_ns < 5 * 60 * 1e9:
+                    ann = 252 * 390
+                elif med_ns < 3600 * 1e9:
+                    ann = 252 * 13
+
+        total_ret = (equity[-1] / self.initial_capital) - 1
         mean_r = ret.mean()
-        std_r = ret.std()
+        std_r = ret.std(ddof=1) if len(ret) > 1 else np.nan
         sharpe = (mean_r / std_r) * np.sqrt(ann) if std_r > 0 else 0
 
         down = ret[ret < 0]
-        sortino = (mean_r / down.std()) * np.sqrt(ann) if len(down) > 0 and down.std() > 0 else 0
+        down_std = down.std(ddof=1) if len(down) > 1 else np.nan
+        sortino = (mean_r / down_std) * np.sqrt(ann) if down_std > 0 else 0
 
-        roll_max = data["equity"].cummax()
-        drawdown = (data["equity"] - roll_max) / roll_max
-        max_dd = drawdown.min()
+        roll_max = np.fmax.accumulate(equity)
+        drawdown = (equity - roll_max) / roll_max
+        max_dd = np.nanmin(drawdown)
 
         return {
             "total_return": round(total_ret * 100, 2),
@@ -112,9 +139,9 @@ class SignalBacktester:
             "sortino": round(sortino, 2),
             "max_drawdown_pct": round(max_dd * 100, 2),
             "win_rate_bars": round((ret > 0).mean() * 100, 2),
-            "total_trades": int(data["trades"].sum() / 2),
-            "equity_final": round(data["equity"].iloc[-1], 2),
-            "n_bars": len(data),
+            "total_trades": int(trades.sum() / 2),
+            "equity_final": round(equity[-1], 2),
+            "n_bars": len(equity),
         }
 
 
@@ -385,28 +412,21 @@ def time_of_day_curves(df: pd.DataFrame, bucket_minutes: int = 30) -> pd.DataFra
     """
     entry_dt = pd.to_datetime(df["entry_time"])
     total_minutes = entry_dt.dt.hour * 60 + entry_dt.dt.minute
-    df = df.copy()
-    df["_bucket_min"] = (total_minutes // bucket_minutes) * bucket_minutes
-    df["_bucket_label"] = df["_bucket_min"].apply(lambda m: f"{m // 60:02d}:{m % 60:02d}")
-
-    summary = df.groupby("_bucket_label").agg(
-        trades=("holly_pnl", "count"),
-        win_rate=("holly_pnl", lambda x: (x > 0).mean()),
-        avg_pnl=("holly_pnl", "mean"),
-        total_pnl=("holly_pnl", "sum"),
-        median_pnl=("holly_pnl", "median"),
-        std_pnl=("holly_pnl", "std"),
+    # Bucket labels as a local Series aligned to df, so the caller's frame is neither copied
+    # nor extended; each distinct bucket is formatted once.
+    bucket_min = (total_minutes // bucket_minutes) * bucket_minutes
+    bucket_label = bucket_min.map({m: f"{m // 60:02d}:{m % 60:02d}" for m in bucket_min.unique()})
+
+    summary = df["holly_pnl"].groupby(bucket_label).agg(
+        trades="count",
+        win_rate=lambda x: (x > 0).mean(),
+        avg_pnl="mean",
+        total_pnl="sum",
+        median_pnl="median",
+        std_pnl="std",
     ).round(4)
 
-    summary["expectancy"] = (summary["win_rate"] * summary.apply(
-        lambda r: df.loc[df["_bucket_label"] == r.name].loc[df["holly_pnl"] > 0, "holly_pnl"].mean()
-        if r["win_rate"] > 0 else 0, axis=1
-    ) + (1 - summary["win_rate"]) * summary.apply(
-        lambda r: df.loc[df["_bucket_label"] == r.name].loc[df["holly_pnl"] < 0, "holly_pnl"].mean()
-        if r["win_rate"] < 1 else 0, axis=1
-    )).round(2)
-
-    # Simplified expectancy: just use avg_pnl (which IS the expectancy)
+    # Expectancy: win_rate * avg_win + loss_rate * avg_loss collapses to avg_pnl
     summary["expectancy"] = summary["avg_pnl"].round(2)
     summary["sharpe_proxy"] = np.where(
         summary["std_pnl"] > 0,
@@ -481,7 +501,7 @@ def main():
             results = {"tod_curves": curves.to_dict("records")}
             print(f"\n{'Bucket':<8} {'Trades':>7} {'WR':>6} {'Avg PnL':>10} "
                   f"{'Total PnL':>12} {'Sharpe':>7}")
-            for _, r in curves.iterrows():
+            for r in results["tod_curves"]:
                 print(f"{r['time_bucket']:<8} {r['trades']:>7} {r['win_rate']:>5.1%} "
                       f"${r['avg_pnl']:>9,.2f} ${r['total_pnl']:>11,.0f} "
                       f"{r['sharpe_proxy']:>7.3f}")
@@ -513,12 +533,12 @@ def main():
             df["timestamp"] = pd.to_datetime(df["timestamp"])
             df.set_index("timestamp", inplace=True)
 
-        # Default: SMA crossover for demo
-        df["sma_fast"] = df["close"].rolling(20).mean()
-        df["sma_slow"] = df["close"].rolling(50).mean()
-        signals = pd.Series(
-            np.where(df["sma_fast"] > df["sma_slow"], 1, -1), index=df.index
-        )
+        # Default: SMA crossover for demo. pandas' rolling mean is already a single O(n)
+        # compiled pass; the averages stay local arrays instead of new columns on df.
+        close = df["close"]
+        sma_fast = close.rolling(20).mean().to_numpy()
+        sma_slow = close.rolling(50).mean().to_numpy()
+        signals = pd.Series(np.where(sma_fast > sma_slow, 1, -1), index=df.index)
 
         bt = SignalBacktester()
         results = bt.run(df, signals)
@@ -4,7 +4,7 @@ import { fileURLToPath } from 'node:url';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const ROOT = path.resolve(__dirname, '..');
-const DB_FILE = path.join(ROOT, 'src/db/database.ts');
+const DB_FILE = path.join(ROOT, 'src/db/connection.ts');
 const SCHEMA_FILE = path.join(ROOT, 'src/db/schema.ts');
 const OUTPUT_FILE = path.join(ROOT, 'analytics/schema.py');
 
@@ -137,9 +137,12 @@ function generatePydanticModel(tableName, columns) {
 
   const modelName = classMap[tableName] || className;
 
+  // Analytics only reads model_fields (column lists); rows are never validated
+  // through these classes. defer_build skips compiling each validator at import,
+  // and frozen marks the models as read-only row shapes.
   let code = `class ${modelName}(BaseModel):\n`;
+  code += `    model_config = ConfigDict(frozen=True, extra="ignore", defer_build=True)\n\n`;
   if (columns.length === 0) {
-    code += `    pass\n`;
     return code;
   }
 
@@ -173,7 +176,7 @@ Do not edit manually. Run 'npm run generate:schema' to update.
 """
 
 from typing import Optional, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 `;
 
@@ -280,6 +280,11 @@ db.exec(`
   CREATE INDEX IF NOT EXISTS idx_drift_alert_timestamp ON drift_alerts(timestamp);
   CREATE INDEX IF NOT EXISTS idx_drift_alert_created ON drift_alerts(created_at);
 
+  -- Partial indexes for the analytics loaders' fixed predicates (analytics/db_loader.py)
+  CREATE INDEX IF NOT EXISTS idx_eval_ts_prefilter ON evaluations(timestamp) WHERE prefilter_passed = 1;
+  CREATE INDEX IF NOT EXISTS idx_eval_sym_ts_prefilter ON evaluations(symbol, timestamp) WHERE prefilter_passed = 1;
+  CREATE INDEX IF NOT EXISTS idx_outcome_eval_taken ON outcomes(evaluation_id, r_multiple) WHERE trade_taken = 1;
+
   ${evalReasoningSchemaSql}
 
   -- TraderSync imported trades (actual trade history for calibration + analytics)
@@ -325,6 +330,7 @@ db.exec(`
   );
   CREATE INDEX IF NOT EXISTS idx_ts_symbol ON tradersync_trades(symbol);
   CREATE INDEX IF NOT EXISTS idx_ts_open_date ON tradersync_trades(open_date);
+  CREATE INDEX IF NOT EXISTS idx_ts_open_date_time ON tradersync_trades(open_date, open_time);
   CREATE INDEX IF NOT EXISTS idx_ts_status ON tradersync_trades(status);
   CREATE INDEX IF NOT EXISTS idx_ts_side ON tradersync_trades(side);
   CREATE INDEX IF NOT EXISTS idx_ts_batch ON tradersync_trades(import_batch);